@@ -0,0 +1,1979 @@
+import os
+import re
+import gzip
+import hashlib
+import time
+import threading
+import heapq
+import importlib.util
+from collections import OrderedDict
+import requests
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+import base64
+from io import BytesIO
+from flask import Flask, Response, request, jsonify, render_template_string, send_file
+import numpy as np
+from city_index import CityStore, CityIndexes, search_partitions, shard_partitions
+from observations import ObservationStore, SECONDS_PER_DAY
+try:
+  import brotli
+except ImportError:  # optional; pages are then precompressed with gzip only
+  brotli = None
+
+# Flask app and WeatherAPI key
+app = Flask(__name__)
+WEATHERAPI_API_KEY = "509a4bd590d64c0fb6a33306250810" # Put your WeatherAPI key here or set as env variable
+
+
+# ----- HCI helpers -----
+def pm25_to_aqi(pm25):
+  """Convert PM2.5 concentration (µg/m3) to US EPA AQI (0-500) using standard breakpoints."""
+  if pm25 is None:
+    return None
+  try:
+    c = float(pm25)
+  except Exception:
+    return None
+  # Breakpoints for PM2.5 (µg/m3)
+  breakpoints = [
+    (0.0, 12.0, 0, 50),
+    (12.1, 35.4, 51, 100),
+    (35.5, 55.4, 101, 150),
+    (55.5, 150.4, 151, 200),
+    (150.5, 250.4, 201, 300),
+    (250.5, 350.4, 301, 400),
+    (350.5, 500.4, 401, 500),
+  ]
+  for (clow, chigh, ilow, ihigh) in breakpoints:
+    if clow <= c <= chigh:
+      aqi = ((ihigh - ilow) / (chigh - clow)) * (c - clow) + ilow
+      return round(aqi, 0)
+  # If beyond table, cap
+  if c > 500.4:
+    return 500
+  return None
+
+
+def normalize(value, min_v, max_v):
+  try:
+    v = float(value)
+  except Exception:
+    return None
+  if max_v == min_v:
+    return 0
+  t = (v - min_v) / (max_v - min_v)
+  t = max(0.0, min(1.0, t))
+  return t * 100.0
+
+
+def compute_component_scores(temp_c, humidity, uv, wind_kph, aqi_pm25, aqi_us=None):
+  """Return component scores (0-100 where higher = worse) for AQI, Temp+Humidity, UV, Wind.
+
+  temp_c: degrees C
+  humidity: percent
+  uv: UV index (0-11+)
+  wind_kph: wind speed in kph
+  aqi_pm25: pm2_5 concentration (µg/m3)
+  aqi_us: optionally precomputed AQI (0-500)
+  """
+  # AQI score: compute AQI from pm2.5 if available, else use provided aqi_us
+  aqi_val = None
+  if aqi_us is not None:
+    try:
+      aqi_val = float(aqi_us)
+    except Exception:
+      aqi_val = None
+  if aqi_val is None and aqi_pm25 is not None:
+    aqi_calc = pm25_to_aqi(aqi_pm25)
+    if aqi_calc is not None:
+      aqi_val = float(aqi_calc)
+
+  aqi_score = None
+  if aqi_val is not None:
+    # Map AQI 0-500 to 0-100
+    aqi_score = max(0.0, min(100.0, aqi_val / 500.0 * 100.0))
+
+  # Temperature: normalize between -10C and 40C -> 0-100 (higher = worse)
+  temp_score = normalize(temp_c, -10.0, 40.0) if temp_c is not None else None
+  # Humidity: treat 0-100% linearly -> 0-100 (higher humidity considered worse here)
+  humidity_score = None
+  try:
+    if humidity is not None:
+      humidity_score = max(0.0, min(100.0, float(humidity)))
+  except Exception:
+    humidity_score = None
+
+  # UV: map 0-11+ to 0-100
+  uv_score = None
+  try:
+    if uv is not None:
+      uv_score = max(0.0, min(100.0, float(uv) / 11.0 * 100.0))
+  except Exception:
+    uv_score = None
+
+  # Wind: map 0-120 kph to 0-100
+  wind_score = None
+  try:
+    if wind_kph is not None:
+      wind_score = max(0.0, min(100.0, float(wind_kph) / 120.0 * 100.0))
+  except Exception:
+    wind_score = None
+
+  return {
+    'aqi_score': aqi_score,
+    'temp_score': temp_score,
+    'humidity_score': humidity_score,
+    'uv_score': uv_score,
+    'wind_score': wind_score,
+    'aqi_val': aqi_val
+  }
+
+# Profile weights (percent -> fraction)
+PROFILE_WEIGHTS = {
+  # split the Temp+Humidity weight into equal temp and humidity parts
+  'general': {'aqi':0.30,'temp':0.15,'humidity':0.15,'uv':0.20,'wind':0.20},
+  'asthma': {'aqi':0.50,'temp':0.10,'humidity':0.10,'uv':0.15,'wind':0.15},
+  'elderly_child': {'aqi':0.30,'temp':0.20,'humidity':0.20,'uv':0.20,'wind':0.10},
+  'athlete': {'aqi':0.20,'temp':0.15,'humidity':0.15,'uv':0.20,'wind':0.30},
+}
+
+# ----- Response caches -----
+class LRUCache:
+  """Thread-safe LRU map from request keys to ready-to-send response bytes"""
+
+  def __init__(self, max_entries):
+    self.max_entries = max_entries
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, key, version=None):
+    """Cached body for key; entries stored under another version count as misses"""
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None or entry[0] != version:
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry[1]
+
+  def put(self, key, body, version=None):
+    with self._lock:
+      self._entries[key] = (version, body)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self):
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        'entries': len(self._entries),
+        'max_entries': self.max_entries,
+        'bytes': sum(len(body) for _, body in self._entries.values()),
+        'hits': self.hits,
+        'misses': self.misses,
+        'hit_rate': round(self.hits / lookups, 4) if lookups else None
+      }
+
+# Autocomplete responses keyed by (folded query, fuzzy mode)
+_search_cache = LRUCache(4096)
+# Chart JSON keyed by (location, profile, compact, points), versioned by the forecast snapshot time
+_chart_cache = LRUCache(1024)
+
+def json_response(body):
+  return Response(body, mimetype='application/json')
+
+# ----- City data -----
+# Regional deployments can keep only some countries in memory, e.g. CITY_PARTITIONS=IN,US
+CITY_PARTITIONS = [c.strip() for c in os.environ.get('CITY_PARTITIONS', '').split(',') if c.strip()]
+
+# Seconds between checks of the city files for changes (0 disables hot reload)
+CITY_RELOAD_INTERVAL = float(os.environ.get('CITY_RELOAD_INTERVAL', '30'))
+# A reload that would shrink the city list below this fraction is treated as a partial file
+CITY_RELOAD_MIN_FRACTION = 0.5
+# Token required by the reload endpoint, which is disabled when it isn't set
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+CITY_DIR = os.path.dirname(os.path.abspath(__file__))
+CITY_CSV_PATH = os.path.join(CITY_DIR, 'worldcities.csv')
+CITY_INDEX_PATH = os.path.join(CITY_DIR, 'worldcities.idx')
+
+# Current CityIndexes (store + derived indexes). It is only ever replaced as a
+# whole, so handlers read it once per request and never mix two generations.
+_city_data = None
+_cities_lock = threading.Lock()   # guards the loader state below; never held while loading
+_reload_lock = threading.Lock()   # one rebuild at a time
+_cities_loading = False           # a thread is reading the first CityIndexes
+_cities_loaded = threading.Event()  # set whenever no first load is in progress
+_cities_loaded.set()
+_cities_ready = threading.Event()   # set once the first CityIndexes is warm
+_cities_loader = None
+_admin_reload = None               # reload started by the admin endpoint
+
+def reset_city_loader_after_fork():
+  """Start the forked child with fresh loader state.
+
+  Locks and events may have been held by threads of the parent, which don't
+  exist in the child; keep whatever city data was already loaded.
+  """
+  global _cities_lock, _reload_lock, _cities_loading, _cities_loaded, _cities_ready, _cities_loader, _admin_reload
+  ready = _cities_ready.is_set()
+  _cities_lock = threading.Lock()
+  _reload_lock = threading.Lock()
+  _cities_loading = False
+  _cities_loaded = threading.Event()
+  _cities_loaded.set()
+  _cities_ready = threading.Event()
+  if ready:
+    _cities_ready.set()
+  _cities_loader = None
+  _admin_reload = None
+
+if hasattr(os, 'register_at_fork'):  # not on Windows, which doesn't fork
+  os.register_at_fork(after_in_child=reset_city_loader_after_fork)
+
+def city_source_signature():
+  """(mtime, size) of the city data files, used to detect changes"""
+  signature = []
+  for path in (CITY_CSV_PATH, CITY_INDEX_PATH):
+    try:
+      st = os.stat(path)
+      signature.append((st.st_mtime_ns, st.st_size))
+    except OSError:
+      signature.append(None)
+  return tuple(signature)
+
+def read_city_store():
+  """Read the cities into a columnar CityStore.
+
+  Prefers the precompiled worldcities.idx (built with `python city_index.py`),
+  which is memory-mapped instead of parsed; falls back to worldcities.csv if
+  the index is missing, older than the CSV or from another format version.
+  Only the countries in CITY_PARTITIONS are kept when it is set. Errors
+  reading the CSV are raised to the caller.
+  """
+  cities = None
+  if os.path.exists(CITY_INDEX_PATH) and (not os.path.exists(CITY_CSV_PATH) or os.path.getmtime(CITY_INDEX_PATH) >= os.path.getmtime(CITY_CSV_PATH)):
+    try:
+      cities = CityStore.from_index(CITY_INDEX_PATH)
+    except ValueError as e:
+      print(f"Ignoring city index: {e}")
+  if cities is None:
+    cities = CityStore.from_csv(CITY_CSV_PATH)
+  if CITY_PARTITIONS:
+    cities = cities.select_countries(CITY_PARTITIONS)
+  return cities
+
+def get_city_data():
+  """Return the current CityIndexes, loading it on first use.
+
+  Only one thread reads the files; concurrent callers wait for it on
+  _cities_loaded rather than on a lock, so no lock is held during the read.
+  """
+  global _city_data, _cities_loading
+  while _city_data is None:
+    with _cities_lock:
+      loader = _city_data is None and not _cities_loading
+      if loader:
+        _cities_loading = True
+        _cities_loaded.clear()
+    if not loader:
+      _cities_loaded.wait()
+      continue
+    try:
+      source = city_source_signature()
+      try:
+        cities = read_city_store()
+      except Exception as e:
+        # Serve without cities rather than fail every request; a fixed file is picked up by the reload check
+        print(f"Error loading cities: {e}")
+        cities = CityStore.empty()
+      _city_data = CityIndexes(cities, source=source)
+    finally:
+      # On failure the next caller retries the load
+      with _cities_lock:
+        _cities_loading = False
+        _cities_loaded.set()
+  return _city_data
+
+def reload_cities():
+  """Rebuild the city store and its indexes from disk, then swap them in atomically.
+
+  Requests that already hold the old CityIndexes finish on it; new requests
+  only ever see a fully built replacement. If the files can't be read, or hold
+  far fewer cities than the current generation (e.g. a file still being
+  copied), the error is raised and the current generation stays in place.
+  """
+  global _city_data
+  with _reload_lock:
+    old = get_city_data()
+    source = city_source_signature()
+    cities = read_city_store()
+    if len(cities) < len(old.store) * CITY_RELOAD_MIN_FRACTION:
+      raise ValueError(f"refusing to replace {len(old.store)} cities with {len(cities)}; is the file complete?")
+    data = CityIndexes(cities, generation=old.generation + 1, source=source).warm()
+    _city_data = data
+    # Cache keys carry the generation; drop the old entries to free memory
+    _search_cache.clear()
+    print(f"Reloaded {len(data.store)} cities (generation {data.generation})")
+    return data
+
+def run_city_loader():
+  """Warm the city indexes, mark them ready, then watch the city files for changes.
+
+  A change is only loaded once the files have looked the same on two checks
+  in a row, so a file that is still being written is not picked up; files
+  that failed to load are not retried until they change again.
+  """
+  try:
+    get_city_data().warm()
+  finally:
+    _cities_ready.set()
+  pending = failed = None
+  while CITY_RELOAD_INTERVAL > 0:
+    time.sleep(CITY_RELOAD_INTERVAL)
+    source = city_source_signature()
+    if source in (get_city_data().source, failed):
+      pending = None
+      continue
+    if source != pending:
+      pending = source
+      continue
+    try:
+      reload_cities()
+    except Exception as e:
+      failed = source
+      print(f"Error reloading cities, keeping generation {get_city_data().generation}: {e}")
+
+def start_city_loader():
+  """Start run_city_loader in a background thread unless it is already running.
+
+  Called before each request rather than at import, so a preforking server
+  (e.g. `gunicorn --preload`) starts one loader in each worker and never
+  forks while the loader is running.
+  """
+  global _cities_loader
+  def needed():
+    if _cities_loader is not None and _cities_loader.is_alive():
+      return False
+    return not _cities_ready.is_set() or CITY_RELOAD_INTERVAL > 0
+  if not needed():
+    return
+  with _cities_lock:
+    if not needed():
+      return
+    _cities_loader = threading.Thread(target=run_city_loader, name='city-loader', daemon=True)
+    _cities_loader.start()
+
+@app.before_request
+def ensure_city_loader():
+  start_city_loader()
+
+def run_admin_reload():
+  try:
+    reload_cities()
+  except Exception as e:
+    print(f"Error reloading cities, keeping generation {get_city_data().generation}: {e}")
+
+@app.route('/api/admin/reload_cities', methods=['POST'])
+def admin_reload_cities():
+  """Rebuild the city indexes in the background and swap them in when ready.
+
+  Only available when ADMIN_TOKEN is set. While a reload is running further
+  requests don't start another one.
+  """
+  global _admin_reload
+  if not ADMIN_TOKEN:
+    return jsonify({"error": "Not found."}), 404
+  if request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+    return jsonify({"error": "Forbidden."}), 403
+  with _cities_lock:
+    running = _reload_lock.locked() or (_admin_reload is not None and _admin_reload.is_alive())
+    if not running:
+      _admin_reload = threading.Thread(target=run_admin_reload, name='city-reload', daemon=True)
+      _admin_reload.start()
+  status = "already reloading" if running else "reloading"
+  return jsonify({"status": status, "generation": get_city_data().generation}), 202
+
+def cities_loading_response():
+  """Degraded answer for city lookups that arrive before the indexes are ready"""
+  resp = jsonify([])
+  resp.headers['Retry-After'] = '1'
+  resp.headers['X-Cities-Loading'] = '1'
+  return resp
+
+def fuzzy_search_cities(query, partitions):
+  """Return city ids within edit distance 1-2 of `query`, ranked by distance then population"""
+  # Short queries are within two edits of almost everything, so tighten the bound
+  if len(query) < 4:
+    return []
+  max_distance = 1 if len(query) < 6 else 2
+  # (distance, id) pairs sort by distance then population; keep each id's best
+  matches = heapq.merge(*(part.fuzzy.search(query, max_distance) for part in partitions))
+  return list(dict.fromkeys(city_id for _, city_id in matches))
+
+def split_filter(value):
+  return tuple(sorted({v.strip() for v in (value or '').split(',') if v.strip()}))
+
+@app.route('/api/search_cities', methods=['GET'])
+def search_cities():
+  """Search cities by query string.
+
+  `fuzzy` controls typo tolerance: "auto" (default) falls back to fuzzy
+  matching when nothing contains the query, "1" always uses it, "0" never does.
+  `country` (names or ISO2 codes) and `region` (admin regions) take
+  comma-separated lists and search only those partitions.
+  """
+  query = request.args.get('q', '').strip().lower()
+  fuzzy = request.args.get('fuzzy', 'auto').lower()
+  countries = split_filter(request.args.get('country'))
+  regions = split_filter(request.args.get('region'))
+  if not query or len(query) < 2:
+    return jsonify([])
+  fuzzy = 'on' if fuzzy in ('1', 'true') else 'off' if fuzzy in ('0', 'false') else 'auto'
+  if not _cities_ready.is_set():
+    # Don't stall the keystroke on the initial load, and don't cache the empty answer
+    return cities_loading_response()
+  
+  # Use one generation of the city data for the whole request
+  data = get_city_data()
+  cache_key = (data.generation, query, fuzzy, countries, regions)
+  body = _search_cache.get(cache_key)
+  if body is not None:
+    return json_response(body)
+  
+  cities = data.store
+  if countries or regions:
+    partitions = [data.partition(key) for key in cities.resolve_partitions(countries, regions)]
+  else:
+    partitions = [data.partition()]
+  
+  def collect(city_ids, limit=10):
+    results = []
+    seen = set()  # Track seen cities to avoid duplicates
+    for city_id in city_ids:
+      # Deduplicate on the label; identical labels share a city and country
+      label = cities.label(city_id)
+      if label in seen:
+        continue
+      results.append({
+        'name': label,
+        'city': cities.city_name(city_id),
+        'country': cities.country_name(city_id),
+        'query': label
+      })
+      seen.add(label)
+      if len(results) >= limit:
+        break
+    return results
+  
+  results = []
+  if fuzzy != 'on':
+    # Rank by match quality (exact name, prefix, then substring) and then
+    # population. Each index yields ids in population order, so collection
+    # stops at the first 10 distinct cities instead of sorting every match.
+    results = collect(search_partitions(partitions, query))
+  
+  if not results and fuzzy != 'off':
+    # Already ranked by edit distance and population
+    results = collect(fuzzy_search_cities(query, partitions))
+  
+  # Serialize once and cache
+  body = jsonify(results).get_data()
+  _search_cache.put(cache_key, body)
+  return json_response(body)
+
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats():
+  """Hit rate and memory of the response caches"""
+  return jsonify({'search_cities': _search_cache.stats(), 'charts': _chart_cache.stats()})
+
+
+# ----- Location dropdowns -----
+def location_response(country=None, state=None):
+  """Serve a pre-serialized LocationTree payload with a strong ETag (304 when unchanged)"""
+  if not _cities_ready.is_set():
+    return cities_loading_response()
+  body, etag = get_city_data().locations.lookup(country, state)
+  resp = json_response(body)
+  resp.set_etag(etag)
+  resp.cache_control.public = True
+  resp.cache_control.max_age = 3600
+  return resp.make_conditional(request)
+
+@app.route('/api/get_locations', methods=['GET'])
+def get_locations():
+  """List countries"""
+  return location_response()
+
+@app.route('/api/get_states', methods=['GET'])
+def get_states():
+  """List states/regions of ?country= (name or ISO2 code)"""
+  country = request.args.get('country', '').strip()
+  if not country:
+    return jsonify({"error": "country is required."}), 400
+  return location_response(country)
+
+@app.route('/api/get_cities', methods=['GET'])
+def get_cities():
+  """List cities of ?country=&state="""
+  country = request.args.get('country', '').strip()
+  state = request.args.get('state', '').strip()
+  if not country or not state:
+    return jsonify({"error": "country and state are required."}), 400
+  return location_response(country, state)
+
+
+# ----- Client-side autocomplete shards -----
+CITY_SHARD_DIR = os.path.join(CITY_DIR, 'static', 'city_shards')
+SHARD_NAME_PATTERN = re.compile(r'^[0-9a-f]{2,16}$')
+
+@app.route('/city_shards/manifest.json')
+def city_shard_manifest():
+  """Current shard version and shard list.
+
+  404 until `python city_index.py` has built them, or when they were built
+  for other CITY_PARTITIONS than this server's (the page then searches here).
+  """
+  path = os.path.join(CITY_SHARD_DIR, 'manifest.json')
+  if not os.path.exists(path):
+    return jsonify({"error": "No autocomplete shards built."}), 404
+  with open(path, encoding='utf-8') as f:
+    if json.load(f).get('partitions', []) != shard_partitions(CITY_PARTITIONS):
+      return jsonify({"error": "Autocomplete shards were built for other CITY_PARTITIONS."}), 404
+  # Small and changes on rebuild: revalidate every time
+  resp = send_file(path, mimetype='application/json', conditional=True, etag=True, max_age=0)
+  resp.cache_control.no_cache = True
+  return resp
+
+@app.route('/city_shards/<version>/<shard>.json')
+def city_shard(version, shard):
+  """Serve a precompressed prefix shard; versioned paths never change, so cache them forever"""
+  if not SHARD_NAME_PATTERN.match(version) or not SHARD_NAME_PATTERN.match(shard):
+    return jsonify({"error": "Not found."}), 404
+  path = os.path.join(CITY_SHARD_DIR, version, shard + '.json.gz')
+  if not os.path.exists(path):
+    return jsonify({"error": "Not found."}), 404
+  if 'gzip' in request.headers.get('Accept-Encoding', ''):
+    resp = send_file(path, mimetype='application/json', conditional=True, etag=True, max_age=31536000)
+    resp.headers['Content-Encoding'] = 'gzip'
+  else:
+    with open(path, 'rb') as f:
+      resp = json_response(gzip.decompress(f.read()))
+  resp.headers['Vary'] = 'Accept-Encoding'
+  resp.cache_control.no_cache = None
+  resp.cache_control.public = True
+  resp.cache_control.max_age = 31536000
+  resp.cache_control.immutable = True
+  return resp
+
+
+# ----- Reverse geocoding -----
+COORD_PATTERN = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+# Coordinate queries this close to a known city are served as that city
+CANONICAL_RADIUS_KM = 10.0
+
+def parse_coordinates(query):
+  """Return (lat, lng) for a "lat,lon" query, or None if it is not one"""
+  match = COORD_PATTERN.match(query or '')
+  if not match:
+    return None
+  lat, lng = float(match.group(1)), float(match.group(2))
+  if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+    return None
+  return lat, lng
+
+def canonicalize_query(query):
+  """Map a location query to the form used upstream and as the forecast cache key.
+
+  Coordinates near a known city collapse to that city's coordinates so nearby
+  points share one cache entry; other coordinates are rounded to ~1 km.
+  Returns (canonical query, nearest city label or None).
+  """
+  coords = parse_coordinates(query)
+  if coords is None:
+    return query.strip(), None
+  if not _cities_ready.is_set():
+    # Cities still loading: skip the city lookup rather than block the request
+    return f"{coords[0]:.2f},{coords[1]:.2f}", None
+  data = get_city_data()
+  matches = data.geo.nearest(*coords)
+  if matches and matches[0][0] <= CANONICAL_RADIUS_KM:
+    city_id = matches[0][1]
+    cities = data.store
+    return f"{cities.lat[city_id]:.4f},{cities.lng[city_id]:.4f}", cities.label(city_id)
+  return f"{coords[0]:.2f},{coords[1]:.2f}", None
+
+@app.route('/api/reverse_geocode', methods=['GET'])
+def reverse_geocode():
+  """Return the k nearest known cities to ?lat=&lon="""
+  try:
+    lat = float(request.args.get('lat', ''))
+    lng = float(request.args.get('lon', request.args.get('lng', '')))
+    k = max(1, min(20, int(request.args.get('k', 1))))
+  except ValueError:
+    return jsonify({"error": "lat and lon must be numbers."}), 400
+  if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+    return jsonify({"error": "Coordinates out of range."}), 400
+  if not _cities_ready.is_set():
+    return cities_loading_response()
+
+  data = get_city_data()
+  cities = data.store
+  results = []
+  for distance_km, city_id in data.geo.nearest(lat, lng, k):
+    label = cities.label(city_id)
+    results.append({
+      'name': label,
+      'city': cities.city_name(city_id),
+      'country': cities.country_name(city_id),
+      'lat': float(cities.lat[city_id]),
+      'lng': float(cities.lng[city_id]),
+      'distance_km': round(distance_km, 3),
+      'query': label
+    })
+  return jsonify(results)
+
+
+# ----- Forecast cache -----
+FORECAST_TTL_SECONDS = 600
+FORECAST_CACHE_SIZE = 1024
+_forecast_cache = {}  # (query, days, include_aqi) -> (fetched_at, WeatherAPI payload)
+_forecast_lock = threading.Lock()
+
+def fetch_forecast(query, days, include_aqi):
+  """Fetch forecast.json from WeatherAPI, reusing responses younger than FORECAST_TTL_SECONDS.
+
+  Returns (fetched_at, payload); fetched_at identifies the snapshot for caches built on it.
+  """
+  key = (query.lower(), days, include_aqi)
+  entry = _forecast_cache.get(key)
+  if entry and time.time() - entry[0] < FORECAST_TTL_SECONDS:
+    return entry
+  api_url = f"https://api.weatherapi.com/v1/forecast.json?key={WEATHERAPI_API_KEY}&q={query}&days={days}&aqi={'yes' if include_aqi else 'no'}&alerts=no"
+  resp = requests.get(api_url, timeout=10)
+  entry = (time.time(), resp.json())
+  if 'error' not in entry[1]:
+    with _forecast_lock:
+      _forecast_cache.pop(key, None)
+      while len(_forecast_cache) >= FORECAST_CACHE_SIZE:
+        # dicts keep insertion order, so the first key is the oldest entry
+        del _forecast_cache[next(iter(_forecast_cache))]
+      _forecast_cache[key] = entry
+  return entry
+
+
+# ----- Weather service -----
+# Scored observations per canonical location, kept locally for history charts
+OBSERVATION_DIR = os.environ.get('OBSERVATION_DIR', os.path.join(CITY_DIR, 'observations'))
+_observations = ObservationStore(OBSERVATION_DIR)
+
+class WeatherError(Exception):
+  """Weather lookup failure carrying the message and HTTP status to report"""
+
+  def __init__(self, message, status):
+    super().__init__(message)
+    self.message = message
+    self.status = status
+
+@dataclass
+class ForecastPoint:
+  """Numeric values of one forecast day (None where WeatherAPI had no data)"""
+  date: str
+  avgtemp_c: Optional[float]
+  humidity: Optional[float]
+  wind_kph: Optional[float]
+  possible_hci: Optional[float]
+
+@dataclass
+class WeatherResult:
+  """Output of fetch_weather: the /api/get_weather JSON body plus typed values for charts"""
+  payload: dict
+  temp_c: float
+  avgtemp_c: float
+  humidity: float
+  wind_kph: float
+  hci: Optional[float]
+  fetched_at: float  # time of the WeatherAPI snapshot the values come from
+  forecast: List[ForecastPoint] = field(default_factory=list)
+
+def fetch_weather(query, forecast_days=0, include_aqi=False, profile=None):
+  """Fetch WeatherAPI data for `query` and compute HCI scores for it.
+
+  Shared by every route that needs weather data, so none of them has to call
+  the app over HTTP. Raises WeatherError when the lookup fails.
+  """
+  if not query:
+    raise WeatherError("Location query is missing.", 400)
+
+  # Coordinates near a known city are canonicalized before the cache lookup
+  upstream_query, nearest_city = canonicalize_query(query)
+
+  # Always use forecast if available (provides more complete data including humidity)
+  days = min(3, forecast_days) if forecast_days and forecast_days > 0 else 1
+  try:
+    fetched_at, weather_data = fetch_forecast(upstream_query, days, include_aqi)
+  except requests.RequestException as e:
+    raise WeatherError("Failed to fetch weather data.", 500)
+  if 'error' in weather_data:
+    raise WeatherError(weather_data['error'].get('message', 'Unknown WeatherAPI error.'), 404)
+
+  try:
+    location = weather_data.get('location', {})
+    location_name = f"{location.get('name','')}, {location.get('country','')}"
+
+    # Current data
+    current = weather_data.get('current', {})
+    temp_c = float(current.get('temp_c', 0))
+    avgtemp_c = float(current.get('avgtemp_c', temp_c))  # Fallback to current temp if avg not present
+    
+    # Humidity extraction - try multiple keys since API structure varies
+    rh = None
+    try:
+      rh = float(current.get('humidity', 0))
+    except (ValueError, TypeError):
+      rh = 0
+    
+    # Wind extraction - ensure we get wind speed properly
+    wind_kph = None
+    try:
+      wind_kph = float(current.get('wind_kph', current.get('max_wind_kph', 0)))
+    except (ValueError, TypeError):
+      wind_kph = 0
+    
+    wind_speed_mps = wind_kph / 3.6
+    condition_text = current.get('condition', {}).get('text', '')
+    condition_icon = current.get('condition', {}).get('icon', '')
+    # UV index may appear in current or in forecast day data
+    uv_index = None
+    if 'uv' in current:
+      try:
+        uv_index = float(current.get('uv'))
+      except Exception:
+        uv_index = None
+
+    # Compute simple Human Comfort Index (user-provided formula)
+    try:
+      temp_val = temp_c
+      rh_val = rh
+      hci = (temp_val + rh_val) / 4.0 
+    except Exception:
+      hci = None
+
+    # Map HCI to comfort indicators
+    comfort_level = None
+    comfort_emoji = ''
+    comfort_description = ''
+    comfort_class = ''
+    try:
+      hci_val = float(hci)
+      if hci_val < 10:
+        comfort_level = 'Cold'
+        comfort_emoji = '🧊'
+        comfort_description = 'Uncomfortably cold for most people'
+        comfort_class = 'text-blue-300 bg-blue-900/30'
+      elif hci_val < 18:
+        comfort_level = 'Cool'
+        comfort_emoji = '❄️'
+        comfort_description = 'Cool but tolerable; may need light clothing'
+        comfort_class = 'text-sky-200 bg-sky-900/30'
+      elif hci_val < 24:
+        comfort_level = 'Comfortable'
+        comfort_emoji = '🙂'
+        comfort_description = 'Ideal thermal comfort for most individuals'
+        comfort_class = 'text-green-200 bg-green-900/20'
+      elif hci_val < 28:
+        comfort_level = 'Warm'
+        comfort_emoji = '😅'
+        comfort_description = 'Slightly warm, may feel humid or stuffy'
+        comfort_class = 'text-yellow-200 bg-yellow-900/20'
+      elif hci_val < 32:
+        comfort_level = 'Hot'
+        comfort_emoji = '🥵'
+        comfort_description = 'Uncomfortable heat, risk of heat stress'
+        comfort_class = 'text-orange-100 bg-orange-900/20'
+      else:
+        comfort_level = 'Very Hot'
+        comfort_emoji = '🔥'
+        comfort_description = 'High risk of heat exhaustion or heatstroke'
+        comfort_class = 'text-red-100 bg-red-900/25'
+    except Exception:
+      hci_val = None
+
+    # Ensure avg temperature key is exposed as `avgtemp_c` (consistent with forecast entries)
+    result = {
+      "location_name": location_name,
+      "temperature_c": f"{temp_c:.1f}",
+      "avgtemp_c": f"{avgtemp_c:.1f}",
+      "humidity": f"{rh:.0f}",
+      "wind_speed": f"{wind_speed_mps:.1f}",
+      "wind_kph": f"{wind_kph:.1f}",
+      "condition": condition_text,
+      "condition_icon": condition_icon,
+      "local_time": location.get('localtime', ''),
+      "hci": f"{hci:.2f}" if hci is not None else None,
+      "comfort_level": comfort_level,
+      "comfort_emoji": comfort_emoji,
+      "comfort_description": comfort_description,
+      "comfort_class": comfort_class,
+      "current_date": location.get('localtime', '').split(' ')[0] if location.get('localtime') else None
+    }
+    if nearest_city is not None:
+      result['nearest_city'] = nearest_city
+
+    # Forecast (if present)
+    forecast_days_data = []
+    forecast_points = []
+    # Extract AQI data early (but do not require it)
+    aqi_data = None
+    if 'current' in weather_data:
+      aqi_data = weather_data['current'].get('air_quality') if isinstance(weather_data['current'], dict) else None
+    pm25 = None
+    if isinstance(aqi_data, dict):
+      for k in ('pm2_5','pm25','pm2_5_us','pm25_us'):
+        if k in aqi_data:
+          try:
+            pm25 = float(aqi_data[k])
+            break
+          except Exception:
+            pm25 = None
+
+    # Compute component scores for current conditions (used to derive profile HCI)
+    comp_scores = compute_component_scores(temp_c, rh, uv_index, float(current.get('wind_kph', 0)), pm25)
+    result['component_scores'] = comp_scores
+    
+    # Add AQI data to result if available
+    if aqi_data:
+      result['aqi'] = aqi_data
+
+    # Compute HCI for every profile so we can clamp forecast HCI values
+    profile_hcis = {}
+    for prof, weights in PROFILE_WEIGHTS.items():
+      contrib = 0.0
+      wsum = 0.0
+      if comp_scores.get('aqi_score') is not None and weights.get('aqi'):
+        contrib += weights['aqi'] * comp_scores['aqi_score']
+        wsum += weights['aqi']
+      if comp_scores.get('temp_score') is not None and weights.get('temp'):
+        contrib += weights['temp'] * comp_scores['temp_score']
+        wsum += weights['temp']
+      if comp_scores.get('humidity_score') is not None and weights.get('humidity'):
+        contrib += weights['humidity'] * comp_scores['humidity_score']
+        wsum += weights['humidity']
+      if comp_scores.get('uv_score') is not None and weights.get('uv'):
+        contrib += weights['uv'] * comp_scores['uv_score']
+        wsum += weights['uv']
+      if comp_scores.get('wind_score') is not None and weights.get('wind'):
+        contrib += weights['wind'] * comp_scores['wind_score']
+        wsum += weights['wind']
+      if wsum > 0:
+        norm_contrib = contrib / wsum
+        prof_hci = 100.0 - norm_contrib
+        profile_hcis[prof] = round(prof_hci, 2)
+      else:
+        profile_hcis[prof] = None
+    result['profile_hcis'] = profile_hcis
+
+    # Determine which HCI baseline to use for clamping forecast HCI (profile-specific if available)
+    sel_profile = (profile or 'general').lower()
+    current_hci_baseline = profile_hcis.get(sel_profile) if profile_hcis.get(sel_profile) is not None else (float(hci) if hci is not None else None)
+    # store chosen baseline as top-level hci in result (string/number preserved)
+    result['hci'] = current_hci_baseline
+
+    if 'forecast' in weather_data and weather_data.get('forecast'):
+      for day in weather_data['forecast'].get('forecastday', []):
+        day_info = day.get('day', {})
+        # Extract UV for the day if present
+        day_uv = None
+        if 'uv' in day_info:
+          try:
+            day_uv = float(day_info.get('uv'))
+          except Exception:
+            day_uv = None
+        # Raw numeric temps (may be None)
+        maxt = day_info.get('maxtemp_c')
+        mint = day_info.get('mintemp_c')
+        avgt = day_info.get('avgtemp_c')
+        # If avg is missing but min/max are present, compute a simple average
+        if avgt is None and maxt is not None and mint is not None:
+          try:
+            avgt = (float(maxt) + float(mint)) / 2.0
+          except Exception:
+            avgt = None
+
+        # Extract humidity and wind for forecast day (if available)
+        day_humidity = day_info.get('avghumidity', None)
+        if day_humidity is None:
+          day_humidity = rh  # Use current humidity if forecast doesn't have it
+        
+        day_wind = day.get('hour', [{}])[0].get('wind_kph', 0) if day.get('hour') else 0
+        if day_wind == 0:
+          day_wind = day_info.get('maxwind_kph', 0)  # Fallback to max wind
+        
+        # Calculate HCI for this forecast day using profile-weighted approach
+        forecast_hci = None
+        if avgt is not None:
+          try:
+            # Compute component scores for forecast day
+            day_comp = compute_component_scores(float(avgt), float(day_humidity), day_uv, float(day_wind), pm25)
+            
+            # Use selected profile's weights to compute forecast HCI
+            sel_prof = (profile or 'general').lower()
+            prof_weights = PROFILE_WEIGHTS.get(sel_prof)
+            if prof_weights and day_comp:
+              hci_contrib = 0.0
+              weight_sum = 0.0
+              if day_comp.get('aqi_score') is not None and prof_weights.get('aqi'):
+                hci_contrib += prof_weights['aqi'] * day_comp['aqi_score']
+                weight_sum += prof_weights['aqi']
+              if day_comp.get('temp_score') is not None and prof_weights.get('temp'):
+                hci_contrib += prof_weights['temp'] * day_comp['temp_score']
+                weight_sum += prof_weights['temp']
+              if day_comp.get('humidity_score') is not None and prof_weights.get('humidity'):
+                hci_contrib += prof_weights['humidity'] * day_comp['humidity_score']
+                weight_sum += prof_weights['humidity']
+              if day_comp.get('uv_score') is not None and prof_weights.get('uv'):
+                hci_contrib += prof_weights['uv'] * day_comp['uv_score']
+                weight_sum += prof_weights['uv']
+              if day_comp.get('wind_score') is not None and prof_weights.get('wind'):
+                hci_contrib += prof_weights['wind'] * day_comp['wind_score']
+                weight_sum += prof_weights['wind']
+              
+              if weight_sum > 0:
+                forecast_hci = 100.0 - (hci_contrib / weight_sum)
+                # Clamp to stay within ±15 of current profile HCI
+                if current_hci_baseline is not None:
+                  baseline = float(current_hci_baseline) if isinstance(current_hci_baseline, str) else current_hci_baseline
+                  min_hci = max(0, baseline - 15)
+                  max_hci = min(100, baseline + 15)
+                  forecast_hci = max(min_hci, min(max_hci, forecast_hci))
+          except Exception as e:
+            forecast_hci = None
+        
+        forecast_comp = None
+
+        # Format temperatures to one decimal where available
+        forecast_days_data.append({
+          'date': day.get('date'),
+          'maxtemp_c': f"{maxt:.1f}" if maxt is not None else None,
+          'mintemp_c': f"{mint:.1f}" if mint is not None else None,
+          'avgtemp_c': f"{avgt:.1f}" if avgt is not None else None,
+          'humidity': f"{day_humidity:.0f}" if day_humidity is not None else None,
+          'wind_kph': f"{day_wind:.1f}" if day_wind is not None else None,
+          'uv': f"{day_uv:.1f}" if day_uv is not None else None,
+          'condition': day_info.get('condition', {}).get('text'),
+          'possible_hci': f"{forecast_hci:.2f}" if forecast_hci is not None else None,
+          'forecast_components': forecast_comp
+        })
+        forecast_points.append(ForecastPoint(
+          date=day.get('date'),
+          avgtemp_c=float(avgt) if avgt is not None else None,
+          humidity=float(day_humidity) if day_humidity is not None else None,
+          wind_kph=float(day_wind) if day_wind is not None else None,
+          possible_hci=forecast_hci
+        ))
+      result['forecast'] = forecast_days_data
+      
+      # Map comfort_score to band and recommendations - define function BEFORE using it
+      def interpret_comfort(score, aqi_val=None, temp=None, hum=None, uv=None, wind_kph=None):
+        s = float(score)
+        band = None
+        desc = None
+        env = []
+        rec = []
+        if s >= 90:
+          band = 'Excellent / Very Comfortable'
+          desc = 'Ideal outdoor conditions. Air is clean, UV moderate, pleasant temperature and humidity.'
+          rec = ['Best time for outdoor activity, exercise, travel.']
+        elif s >= 75:
+          band = 'Comfortable'
+          desc = 'Slight variation in one or two parameters but overall safe for most people.'
+          rec = ['Good for outdoor activity; stay hydrated and use sunscreen if UV is high.']
+        elif s >= 60:
+          band = 'Moderate Comfort'
+          desc = 'Conditions acceptable for healthy individuals, mild discomfort for sensitive people.'
+          rec = ['Limit long outdoor exposure, protective gear recommended.']
+        elif s >= 45:
+          band = 'Uncomfortable'
+          desc = 'Increasing discomfort due to high heat, humidity, poor air, or high UV.'
+          rec = ['Avoid prolonged outdoor activity, especially for elderly/asthmatics.']
+        elif s >= 30:
+          band = 'Poor Comfort / Caution'
+          desc = 'Multiple factors deteriorate comfort. Air or heat may cause physical strain.'
+          rec = ['Sensitive individuals should remain indoors; stay hydrated.']
+        elif s >= 15:
+          band = 'Very Poor / Health Risk'
+          desc = 'Unhealthy air, extreme heat or UV, oppressive humidity.'
+          rec = ['Outdoor activity discouraged; use masks and cooling measures.']
+        else:
+          band = 'Severe Discomfort / Dangerous'
+          desc = 'Hazardous environmental conditions, high health risk.'
+          rec = ['Stay indoors; emergency conditions for health-sensitive individuals.']
+
+        if aqi_val is not None:
+          try:
+            if aqi_val < 50:
+              env.append('AQI < 50')
+            elif aqi_val < 80:
+              env.append('AQI < 80')
+            elif aqi_val < 120:
+              env.append('AQI < 120')
+            elif aqi_val < 150:
+              env.append('AQI 120–150')
+            elif aqi_val < 200:
+              env.append('AQI 150–200')
+            elif aqi_val < 300:
+              env.append('AQI 200–300')
+            else:
+              env.append('AQI > 300')
+          except Exception:
+            pass
+        if temp is not None:
+          try:
+            t = float(temp)
+            if 20 <= t <= 28:
+              env.append('Temp 20–28 °C')
+            elif 28 < t <= 32:
+              env.append('Temp 28–32 °C')
+            elif 32 < t <= 35:
+              env.append('Temp 32–35 °C')
+            elif t > 35:
+              env.append('Temp > 35 °C')
+            elif t < 18:
+              env.append('Temp < 18 °C')
+          except Exception:
+            pass
+        if hum is not None:
+          try:
+            h = float(hum)
+            if h > 70:
+              env.append('Humidity > 70%')
+            elif 40 <= h <= 60:
+              env.append('Humidity 40–60%')
+          except Exception:
+            pass
+        if uv is not None:
+          try:
+            u = float(uv)
+            if u <= 4:
+              env.append('UV ≤ 4')
+            elif u <= 6:
+              env.append('UV ≤ 6')
+            elif u <= 7:
+              env.append('UV ≤ 7')
+            elif u <= 8:
+              env.append('UV > 8')
+            else:
+              env.append('UV very high')
+          except Exception:
+            pass
+        if wind_kph is not None:
+          try:
+            w = float(wind_kph)
+            if 10.8 <= w <= 18.0: # 3-5 m/s in kph
+              env.append('mild wind (3–5 m/s)')
+          except Exception:
+            pass
+
+        return {
+          'band': band,
+          'description': desc,
+          'environmental_interpretation': ', '.join(env) if env else None,
+          'recommendations': rec
+        }
+
+      # Compute profile-weighted HCI using the new formula (default to 'general' if not provided)
+      profile = profile or 'general'
+      pw = PROFILE_WEIGHTS.get(profile.lower())
+      if pw:
+        hci_contrib = 0.0
+        weight_sum = 0.0
+        if comp_scores.get('aqi_score') is not None and pw.get('aqi'):
+          hci_contrib += pw['aqi'] * comp_scores['aqi_score']
+          weight_sum += pw['aqi']
+        if comp_scores.get('temp_score') is not None and pw.get('temp'):
+          hci_contrib += pw['temp'] * comp_scores['temp_score']
+          weight_sum += pw['temp']
+        if comp_scores.get('humidity_score') is not None and pw.get('humidity'):
+          hci_contrib += pw['humidity'] * comp_scores['humidity_score']
+          weight_sum += pw['humidity']
+        if comp_scores.get('uv_score') is not None and pw.get('uv'):
+          hci_contrib += pw['uv'] * comp_scores['uv_score']
+          weight_sum += pw['uv']
+        if comp_scores.get('wind_score') is not None and pw.get('wind'):
+          hci_contrib += pw['wind'] * comp_scores['wind_score']
+          weight_sum += pw['wind']
+
+        if weight_sum > 0:
+          normalized_contrib = hci_contrib / weight_sum
+          hci_weighted = 100.0 - normalized_contrib
+          result['weighted_hci'] = round(hci_weighted,2)
+          result['comfort_score'] = round(hci_weighted,2)
+          result['profile_used'] = profile.lower()
+        else:
+          # Still compute comfort_score if weight_sum is 0
+          result['comfort_score'] = None
+      # Call interpret_comfort if comfort_score exists
+      if result.get('comfort_score') is not None:
+        interp = interpret_comfort(result['comfort_score'], aqi_val=comp_scores.get('aqi_val'), temp=temp_c, hum=rh, uv=uv_index, wind_kph=float(current.get('wind_kph',0)))
+        result.update(interp)
+    else:
+      result['profile_error'] = 'Unknown profile'
+
+    weather = WeatherResult(
+      payload=result,
+      temp_c=temp_c,
+      avgtemp_c=avgtemp_c,
+      humidity=rh,
+      wind_kph=wind_kph,
+      hci=float(current_hci_baseline) if current_hci_baseline is not None else None,
+      fetched_at=fetched_at,
+      forecast=forecast_points
+    )
+    observed_at = float(current.get('last_updated_epoch') or fetched_at)
+    general_hci = profile_hcis.get('general')
+  except Exception:
+    raise WeatherError("Invalid data from WeatherAPI.", 500)
+
+  # History for the monthly chart; the store ignores snapshots it has already seen
+  try:
+    _observations.record(location_name, observed_at, temp_c=temp_c, humidity=rh, wind_kph=wind_kph,
+                         hci=general_hci if general_hci is not None else hci)
+  except OSError as e:
+    print(f"Could not record observation for {location_name}: {e}")
+  return weather
+
+
+@app.route('/api/get_weather', methods=['POST'])
+def get_weather():
+  data = request.get_json() or {}
+  try:
+    weather = fetch_weather(
+      data.get('query'),
+      forecast_days=int(data.get('forecast_days', 0)),
+      include_aqi=bool(data.get('include_aqi', False)),
+      profile=data.get('profile')
+    )
+  except WeatherError as e:
+    return jsonify({"error": e.message}), e.status
+  return jsonify(weather.payload)
+
+HTML_TEMPLATE = r"""
+<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>Human Comfort Index - Real-time Weather Analytics</title>
+    <link rel="stylesheet" href="{{ asset_url('css/index.css') }}">
+    {% if has_asset('css/tailwind.css') %}
+    <link rel="stylesheet" href="{{ asset_url('css/tailwind.css') }}">
+    {% else %}
+    <script src="https://cdn.tailwindcss.com"></script>
+    {% endif %}
+  </head>
+  <body class="bg-gradient-to-b from-slate-950 via-indigo-950 to-slate-900 text-slate-100 min-h-screen p-6 theme-transition">
+    <!-- Animated Background -->
+    <div class="fixed inset-0 z-0 opacity-30 theme-transition" id="bgGradient">
+      <div class="absolute top-20 left-10 w-72 h-72 bg-cyan-500 rounded-full mix-blend-multiply filter blur-3xl animate-pulse"></div>
+      <div class="absolute top-40 right-10 w-72 h-72 bg-purple-500 rounded-full mix-blend-multiply filter blur-3xl animate-pulse animation-delay-2000"></div>
+      <div class="absolute -bottom-8 left-20 w-72 h-72 bg-blue-500 rounded-full mix-blend-multiply filter blur-3xl animate-pulse animation-delay-4000"></div>
+    </div>
+    
+    <div class="max-w-6xl mx-auto relative z-10">
+      <!-- Header with Dynamic Animated Logo -->
+      <div class="mb-8 rounded-2xl overflow-hidden shadow-2xl animate-slide-in">
+        <div class="bg-gradient-to-r from-indigo-600 via-purple-600 to-pink-600 p-1">
+          <div class="bg-gradient-to-br from-slate-950/95 to-slate-900/95 backdrop-blur-sm p-8 rounded-xl border border-gradient-to-r from-cyan-400/20 to-purple-400/20 theme-transition">
+            <!-- Top Right - Theme Toggle -->
+            <div class="flex justify-end mb-4">
+              <button id="themeToggle" class="dark-mode-toggle bg-slate-800 hover:bg-slate-700 text-yellow-400 border border-slate-700">
+                <span id="themeIcon" class="text-2xl">🌙</span>
+              </button>
+            </div>
+            
+            <div class="flex items-center justify-between gap-6">
+              <div class="flex-1">
+                <h1 class="text-6xl font-bold bg-gradient-to-r from-cyan-300 via-blue-300 to-purple-300 bg-clip-text text-transparent mb-2">Human Comfort Index</h1>
+                <p class="text-lg text-slate-300">Real-time Comfort Analysis & Advanced Weather Analytics</p>
+                <div class="flex gap-4 mt-4 flex-wrap">
+                  <div class="flex items-center gap-2 text-sm text-cyan-300 card-hover cursor-default"><span class="text-xl">🎯</span> <span>Precision Data</span></div>
+                  <div class="flex items-center gap-2 text-sm text-purple-300 card-hover cursor-default"><span class="text-xl">📊</span> <span>AI Analytics</span></div>
+                  <div class="flex items-center gap-2 text-sm text-pink-300 card-hover cursor-default"><span class="text-xl">⚡</span> <span>Real-time</span></div>
+                </div>
+              </div>
+              
+              <!-- Dynamic Animated Logo -->
+              <div class="flex flex-col items-center gap-3">
+                <div class="relative w-48 h-48 bg-gradient-to-b from-blue-300 to-blue-100 rounded-full shadow-2xl flex items-center justify-center animate-glow">
+                  <!-- Cloud 1 - Top Left -->
+                  <div class="absolute top-6 left-4 w-16 h-8 bg-white rounded-full opacity-90 shadow-lg animate-cloud-drift"></div>
+                  
+                  <!-- Cloud 2 - Top Right -->
+                  <div class="absolute top-12 right-6 w-14 h-7 bg-white rounded-full opacity-85 shadow-lg animate-cloud-drift" style="animation-delay: 2s;"></div>
+                  
+                  <!-- Sun - Center -->
+                  <div class="animate-spin-sun">
+                    <div class="w-14 h-14 bg-gradient-to-br from-yellow-300 via-yellow-400 to-orange-400 rounded-full shadow-xl"></div>
+                  </div>
+                  
+                  <!-- Wind Lines - Bottom -->
+                  <div class="absolute bottom-8 left-6 right-6 space-y-2">
+                    <div class="h-1 bg-gradient-to-r from-transparent via-cyan-400 to-transparent rounded-full animate-wind-blow"></div>
+                    <div class="h-1 bg-gradient-to-r from-transparent via-cyan-400 to-transparent rounded-full animate-wind-blow" style="animation-delay: 0.4s;"></div>
+                  </div>
+                </div>
+                
+                <a href="/visualization" class="inline-flex items-center gap-2 px-6 py-3 bg-gradient-to-r from-purple-600 to-pink-600 hover:from-purple-500 hover:to-pink-500 text-white rounded-lg shadow-lg font-bold transition-all transform hover:scale-105 card-hover">📊 Dashboard</a>
+              </div>
+            </div>
+          </div>
+        </div>
+      </div>
+
+      <!-- Main Content Grid -->
+      <div class="mb-8">
+
+      <div class="mb-6">
+        <!-- Manual Entry -->
+        <div class="rounded-xl shadow-lg mb-6">
+          <div class="bg-gradient-to-r from-orange-500 to-red-500 p-1 rounded-xl">
+            <div class="bg-slate-800/60 backdrop-blur-sm p-6 rounded-lg">
+              <label class="text-sm font-bold text-orange-300 flex items-center gap-2 mb-3">
+                <span class="text-lg">⌨️</span>
+                <span><h2>Enter City:</h2></span>
+              </label>
+              <div class="flex gap-3 items-start">
+                <div class="relative flex-1">
+                  <input id="location-input" type="text" placeholder="Enter city name or coordinates (lat,lon)" class="w-full p-4 rounded-lg bg-slate-700/60 border-2 border-orange-400/50 text-slate-100 placeholder:text-slate-500 focus:border-orange-300 focus:outline-none transition-all hover:border-orange-400" autocomplete="off" />
+                  <div id="city-suggestions" class="bg-slate-800/95 backdrop-blur-sm border border-orange-400/50 rounded-lg shadow-2xl max-h-60 overflow-y-auto hidden"></div>
+                </div>
+                <button id="fetch-weather-btn" class="relative z-10 px-6 py-4 bg-gradient-to-r from-cyan-500 via-blue-500 to-indigo-500 hover:from-cyan-400 hover:via-blue-400 hover:to-indigo-400 text-white rounded-lg font-bold text-lg shadow-xl transition-all transform hover:scale-105 hover:shadow-2xl whitespace-nowrap">
+                  <span class="flex items-center justify-center gap-2">
+                    <span class="text-2xl">🔍</span>
+                    <span>Get Weather & HCI Analysis</span>
+                  </span>
+                </button>
+              </div>
+            </div>
+          </div>
+        </div>
+        
+        <!-- Options Grid -->
+        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-5 gap-3 mb-6">
+          <div class="rounded-lg overflow-hidden shadow-lg">
+            <div class="bg-gradient-to-r from-blue-500 to-indigo-500 p-1">
+              <select id="units" class="w-full p-3 rounded-lg bg-slate-800/60 border border-blue-400/50 text-slate-100 focus:border-blue-300 focus:outline-none cursor-pointer transition-all font-semibold">
+                <option value="metric">🌡️ Celsius</option>
+              </select>
+            </div>
+          </div>
+          
+          <div class="rounded-lg overflow-hidden shadow-lg">
+            <div class="bg-gradient-to-r from-violet-500 to-purple-500 p-1">
+              <select id="forecast_days" class="w-full p-3 rounded-lg bg-slate-800/60 border border-violet-400/50 text-slate-100 focus:border-violet-300 focus:outline-none cursor-pointer transition-all font-semibold">
+                <option value="0">📅 Now</option>
+                <option value="1">📆 1 Day</option>
+                <option value="2">📆 2 Days</option>
+                <option value="3" selected>📆 3 Days</option>
+              </select>
+            </div>
+          </div>
+          
+          <div class="flex items-center gap-2 p-3 bg-gradient-to-r from-teal-500 to-cyan-500 rounded-lg shadow-lg">
+            <span class="text-lg">✅</span>
+            <span class="text-sm font-bold text-white">🌫️ AQI</span>
+          </div>
+          
+          <div class="flex items-center gap-2 p-3 bg-gradient-to-r from-yellow-500 to-orange-500 rounded-lg shadow-lg">
+            <span class="text-lg">✅</span>
+            <span class="text-sm font-bold text-white">☀️ UV</span>
+          </div>
+          
+          <div class="rounded-lg overflow-hidden shadow-lg">
+            <div class="bg-gradient-to-r from-pink-500 to-rose-500 p-1">
+              <select id="profile" class="w-full p-3 rounded-lg bg-slate-800/60 border border-pink-400/50 text-slate-100 focus:border-pink-300 focus:outline-none cursor-pointer transition-all font-semibold text-sm">
+                <option value="general">👤 General</option>
+                <option value="asthma">🫁 Asthma</option>
+                <option value="elderly_child">👴👧 Elderly</option>
+                <option value="athlete">🏃 Athlete</option>
+              </select>
+            </div>
+          </div>
+        </div>
+      </div>
+
+      <div id="status-message" class="mb-4 text-sm font-semibold text-transparent bg-gradient-to-r from-cyan-300 to-blue-300 bg-clip-text"></div>
+
+      <!-- Weather Cards Grid -->
+      <div class="grid grid-cols-1 lg:grid-cols-3 gap-6 mb-8">
+        <!-- HCI Card -->
+        <div class="rounded-2xl overflow-hidden shadow-2xl card-hover animate-slide-in">
+          <div class="bg-gradient-to-r from-amber-500 via-orange-500 to-red-500 p-1">
+            <div class="bg-gradient-to-br from-slate-900/95 to-slate-800/95 backdrop-blur-sm p-8 rounded-xl theme-transition">
+              <div class="flex items-center gap-3 mb-6">
+                <span class="text-4xl animate-pulse">🎯</span>
+                <h3 class="text-2xl font-bold text-transparent bg-gradient-to-r from-amber-300 to-orange-300 bg-clip-text">Human Comfort Index</h3>
+              </div>
+              <div id="hci-value" class="text-7xl font-black text-center my-6 text-transparent bg-gradient-to-r from-amber-300 via-orange-300 to-red-300 bg-clip-text animate-pulse">--</div>
+              <div id="comfort-badge" class="text-center px-6 py-3 rounded-full text-sm font-bold mb-4 bg-gradient-to-r from-slate-900/95 to-slate-800/95 transition-all duration-300">--</div>
+              <div id="comfort-desc" class="text-center text-sm text-slate-300 mb-6 italic">--</div>
+              
+              <!-- Band, Env, Rec section -->
+              <div class="space-y-3 text-center text-sm mb-6 pb-6 border-b border-amber-500/30">
+                <div class="text-slate-300">Band: <span id="comfort-band" class="font-semibold text-amber-300">--</span></div>
+                <div class="text-slate-300">Env: <span id="comfort-env" class="font-semibold text-amber-300">--</span></div>
+                <div class="text-slate-300">Rec: <span id="comfort-rec" class="font-semibold text-amber-300">--</span></div>
+              </div>
+              
+              <div class="space-y-4 pt-6 border-t border-amber-500/30">
+                <div class="flex justify-between items-center p-2 rounded hover:bg-slate-800/30 transition-all">
+                  <span class="text-slate-400 text-sm font-semibold">📊 Weighted HCI</span>
+                  <span id="weighted-hci" class="font-bold text-lg text-amber-300">--</span>
+                </div>
+                <div class="grid grid-cols-2 gap-3 text-xs">
+                  <div class="bg-slate-800/50 p-3 rounded-lg border border-amber-400/30 hover:border-amber-400/60 hover:bg-slate-700/50 transition-all cursor-default">
+                    <div class="text-slate-500 font-semibold">AQI</div>
+                    <div id="comp-aqi" class="text-amber-200 font-bold text-lg mt-1">--</div>
+                  </div>
+                  <div class="bg-slate-800/50 p-3 rounded-lg border border-amber-400/30 hover:border-amber-400/60 hover:bg-slate-700/50 transition-all cursor-default">
+                    <div class="text-slate-500 font-semibold">Temp</div>
+                    <div id="comp-temp" class="text-amber-200 font-bold text-lg mt-1">--</div>
+                  </div>
+                  <div class="bg-slate-800/50 p-3 rounded-lg border border-amber-400/30 hover:border-amber-400/60 hover:bg-slate-700/50 transition-all cursor-default">
+                    <div class="text-slate-500 font-semibold">Humidity</div>
+                    <div id="comp-humidity" class="text-amber-200 font-bold text-lg mt-1">--</div>
+                  </div>
+                  <div class="bg-slate-800/50 p-3 rounded-lg border border-amber-400/30 hover:border-amber-400/60 hover:bg-slate-700/50 transition-all cursor-default">
+                    <div class="text-slate-500 font-semibold">UV</div>
+                    <div id="comp-uv" class="text-amber-200 font-bold text-lg mt-1">--</div>
+                  </div>
+                  <div class="bg-slate-800/50 p-3 rounded-lg border border-amber-400/30 hover:border-amber-400/60 hover:bg-slate-700/50 transition-all cursor-default">
+                    <div class="text-slate-500 font-semibold">Wind</div>
+                    <div id="comp-wind" class="text-amber-200 font-bold text-lg mt-1">--</div>
+                  </div>
+                </div>
+              </div>
+            </div>
+          </div>
+        </div>
+        
+        <!-- Weather Info Card -->
+        <div class="lg:col-span-2 rounded-2xl overflow-hidden shadow-2xl card-hover animate-slide-in">
+          <div class="bg-gradient-to-r from-indigo-500 via-purple-500 to-pink-500 p-1">
+            <div class="bg-gradient-to-br from-slate-900/95 to-slate-800/95 backdrop-blur-sm p-6 rounded-xl theme-transition">
+              <div class="flex items-center justify-between mb-4">
+                <div class="flex-1">
+                  <p id="loc" class="text-3xl font-bold text-transparent bg-gradient-to-r from-cyan-300 to-blue-300 bg-clip-text">--</p>
+                  <div class="flex items-center gap-3 mt-2">
+                    <div id="weatherIcon" class="text-4xl animate-bounce" data-weather-icon>🌡️</div>
+                    <p id="cond" class="text-base text-slate-300">--</p>
+                  </div>
+                </div>
+              </div>
+              
+              <div class="grid grid-cols-1 md:grid-cols-2 gap-3">
+                <div class="rounded-lg overflow-hidden card-hover">
+                  <div class="bg-gradient-to-r from-red-500 to-orange-500 p-1">
+                    <div class="bg-slate-800/60 p-4 rounded text-center hover:bg-slate-700/60 transition-all">
+                      <div class="text-xs text-slate-400 mb-2">🌡️ Temperature</div>
+                      <div id="temp" class="text-2xl font-bold text-red-300">--</div>
+                    </div>
+                  </div>
+                </div>
+                
+                <div class="rounded-lg overflow-hidden card-hover">
+                  <div class="bg-gradient-to-r from-orange-500 to-yellow-500 p-1">
+                    <div class="bg-slate-800/60 p-4 rounded text-center hover:bg-slate-700/60 transition-all">
+                      <div class="text-xs text-slate-400 mb-2">📊 Avg Temp</div>
+                      <div id="avgtemp_c" class="text-2xl font-bold text-yellow-300">--</div>
+                    </div>
+                  </div>
+                </div>
+                
+
+              </div>
+              
+              <div id="aqi" class="mt-4 p-4 bg-slate-800/50 rounded-lg border border-slate-700/50 text-sm text-slate-300 hover:bg-slate-700/50 transition-all"></div>
+            </div>
+          </div>
+        </div>
+
+      <!-- Forecast Section -->
+      <div id="forecast-section" class="mt-10"></div>
+
+    </div>
+
+    <script src="{{ asset_url('js/index.js') }}"></script>
+  </body>
+</html>
+"""
+
+
+VIS_TEMPLATE = r"""
+<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>Weather.ai — Visualization</title>
+    {% if has_asset('js/plotly-basic.min.js') %}
+    <script src="{{ asset_url('js/plotly-basic.min.js') }}"></script>
+    {% elif has_asset('js/plotly.min.js') %}
+    <script src="{{ asset_url('js/plotly.min.js') }}"></script>
+    {% else %}
+    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    {% endif %}
+    <link rel="stylesheet" href="{{ asset_url('css/visualization.css') }}">
+    {% if has_asset('css/tailwind.css') %}
+    <link rel="stylesheet" href="{{ asset_url('css/tailwind.css') }}">
+    {% else %}
+    <script src="https://cdn.tailwindcss.com"></script>
+    {% endif %}
+  </head>
+  <body class="bg-gradient-to-b from-slate-950 via-indigo-950 to-slate-900 text-slate-100 min-h-screen p-6 theme-transition">
+    <!-- Animated Background (same look as main) -->
+    <div class="fixed inset-0 z-0 opacity-30 theme-transition" id="bgGradient">
+      <div class="absolute top-20 left-10 w-72 h-72 bg-cyan-500 rounded-full mix-blend-multiply filter blur-3xl animate-pulse"></div>
+      <div class="absolute top-40 right-10 w-72 h-72 bg-purple-500 rounded-full mix-blend-multiply filter blur-3xl animate-pulse animation-delay-2000"></div>
+      <div class="absolute -bottom-8 left-20 w-72 h-72 bg-blue-500 rounded-full mix-blend-multiply filter blur-3xl animate-pulse animation-delay-4000"></div>
+    </div>
+
+    <div class="max-w-7xl mx-auto relative z-10">
+      <!-- Header Card matching main page style -->
+      <div class="mb-6 rounded-2xl overflow-hidden shadow-2xl animate-slide-in">
+        <div class="bg-gradient-to-r from-indigo-600 via-purple-600 to-pink-600 p-1 rounded-2xl">
+          <div class="bg-gradient-to-br from-slate-950/95 to-slate-900/95 backdrop-blur-sm p-6 rounded-xl border border-gradient-to-r from-cyan-400/20 to-purple-400/20 theme-transition flex items-center justify-between">
+            <div>
+              <h1 class="text-4xl font-bold text-transparent bg-gradient-to-r from-cyan-300 via-blue-300 to-purple-300 bg-clip-text">Weather Analytics — Visualization</h1>
+              <p class="text-sm text-slate-300 mt-1">Interactive charts and KPIs — styled to match main dashboard</p>
+            </div>
+            <div class="flex items-center gap-3">
+              <a href="/" class="inline-flex items-center gap-2 px-4 py-2 bg-gradient-to-r from-purple-600 to-pink-600 text-white rounded-lg shadow hover:scale-105">🏠 Back</a>
+            </div>
+          </div>
+        </div>
+      </div>
+
+      <!-- Main visualization grid (keeps original layout but restyled) -->
+      <div class="grid grid-cols-1 lg:grid-cols-4 gap-4">
+        <div class="col-span-1 p-4 rounded-2xl border border-slate-700/30 bg-gradient-to-br from-slate-900/60 to-slate-800/40 shadow-lg">
+          <label class="text-sm text-slate-300">Location</label>
+          <input id="viz-location" class="w-full mt-3 p-3 rounded-lg bg-slate-800/60 border border-slate-700 text-slate-100" placeholder="Enter city or 'lat,lon'" />
+          <div class="mt-3 grid grid-cols-2 gap-2">
+            <select id="viz-units" class="p-2 rounded bg-slate-800 border border-slate-700 text-slate-100">
+              <option value="metric">Celsius</option>
+            </select>
+            <button id="viz-fetch" class="p-2 bg-gradient-to-r from-cyan-500 to-blue-600 rounded-lg text-white font-bold">Refresh</button>
+          </div>
+
+          <div class="mt-4 space-y-3">
+            <div class="p-3 bg-slate-800/50 rounded-lg border border-slate-700/30">
+              <div class="text-xs text-slate-400">HCI</div>
+              <div id="viz-hci" class="text-2xl font-bold text-amber-300">--</div>
+            </div>
+            <div class="p-3 bg-slate-800/50 rounded-lg border border-slate-700/30">
+              <div class="text-xs text-slate-400">Temperature</div>
+              <div id="viz-temp" class="text-2xl font-bold text-yellow-300">--</div>
+            </div>
+            <div class="p-3 bg-slate-800/50 rounded-lg border border-slate-700/30">
+              <div class="text-xs text-slate-400">Humidity</div>
+              <div id="viz-hum" class="text-2xl font-bold text-cyan-300">--</div>
+            </div>
+            <div class="p-3 bg-slate-800/50 rounded-lg border border-slate-700/30">
+              <div class="text-xs text-slate-400">AQI (PM2.5)</div>
+              <div id="viz-aqi" class="text-2xl font-bold text-amber-200">--</div>
+            </div>
+          </div>
+        </div>
+
+        <div class="lg:col-span-3 grid grid-cols-1 gap-4">
+          <div class="bg-gradient-to-br from-slate-900/60 to-slate-800/50 p-4 rounded-2xl border border-slate-700/30 shadow-lg h-96">
+            <div id="chart-hci" class="w-full h-full plotly-container"></div>
+          </div>
+
+          <div class="grid grid-cols-1 md:grid-cols-3 gap-4">
+            <div class="bg-gradient-to-br from-slate-900/60 to-slate-800/50 p-4 rounded-lg border border-slate-700/30 shadow-lg h-80"><div id="chart-temp" class="w-full h-full plotly-container"></div></div>
+            <div class="bg-gradient-to-br from-slate-900/60 to-slate-800/50 p-4 rounded-lg border border-slate-700/30 shadow-lg h-80"><div id="chart-humidity" class="w-full h-full plotly-container"></div></div>
+            <div class="bg-gradient-to-br from-slate-900/60 to-slate-800/50 p-4 rounded-lg border border-slate-700/30 shadow-lg h-80"><div id="chart-wind" class="w-full h-full plotly-container"></div></div>
+          </div>
+
+          <div class="bg-gradient-to-br from-slate-900/60 to-slate-800/50 p-4 rounded-2xl border border-slate-700/30 shadow-lg h-96">
+            <div id="chart-monthly" class="w-full h-full plotly-container"></div>
+          </div>
+        </div>
+      </div>
+
+    <script src="{{ asset_url('js/visualization.js') }}"></script>
+  </body>
+</html>
+"""
+
+
+# ----- Static pages and assets -----
+class StaticContent:
+  """Bytes compressed once and served with a strong ETag per encoding.
+
+  Pages keep their URL across releases, so clients revalidate them (cheap
+  304s); assets live at content-hashed URLs and are cached forever.
+  """
+
+  # Bodies this large (vendored bundles) are compressed on first request, not at startup,
+  # unless they come precompressed
+  LAZY_BYTES = 1 << 20
+
+  def __init__(self, body, mimetype, immutable=False, precompressed=None):
+    if isinstance(body, str):
+      body = body.encode('utf-8')
+    self.body = body
+    self.digest = hashlib.sha1(body).hexdigest()[:20]
+    self.mimetype = mimetype
+    self.immutable = immutable
+    self.precompressed = precompressed or {}  # encoding -> bytes
+    self._variants = None
+    self._lock = threading.Lock()
+    if self.precompressed or len(body) < self.LAZY_BYTES:
+      self.variants()
+
+  def variants(self):
+    """(encoding, bytes, etag) tuples, preferred first; the uncompressed body is the fallback"""
+    if self._variants is not None:
+      return self._variants
+    with self._lock:
+      if self._variants is None:
+        body = self.body
+        encoded = self.precompressed
+        if not encoded:
+          encoded = {'gzip': gzip.compress(body, 9)}
+          if brotli is not None:
+            # Top quality takes seconds on multi-megabyte bundles; it only pays off on small bodies
+            quality = 11 if len(body) < self.LAZY_BYTES else 6
+            encoded['br'] = brotli.compress(body, quality=quality)
+        variants = [(name, encoded[name], self.digest + suffix) for name, suffix in (('br', '-br'), ('gzip', '-gz')) if name in encoded]
+        self._variants = variants + [(None, body, self.digest)]
+      return self._variants
+
+  def response(self):
+    accepted = request.accept_encodings
+    encoding, body, tag = next(v for v in self.variants() if v[0] is None or accepted[v[0]])
+    resp = Response(body, mimetype=self.mimetype)
+    if encoding:
+      resp.headers['Content-Encoding'] = encoding
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.set_etag(tag)
+    if self.immutable:
+      resp.cache_control.public = True
+      resp.cache_control.max_age = 31536000
+      resp.cache_control.immutable = True
+    else:
+      resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+
+ASSET_DIR = os.path.join(CITY_DIR, 'static')
+ASSET_TYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+_assets = {}  # hashed path, e.g. css/index.1a2b3c4d5e6f.css -> StaticContent
+_asset_paths = {}  # source path, e.g. css/index.css -> hashed path
+
+def read_precompressed(file_path, body):
+  """Build-time .gz/.br siblings of file_path that still decode to body, by encoding"""
+  decoders = {'gzip': ('.gz', gzip.decompress)}
+  if brotli is not None:
+    decoders['br'] = ('.br', brotli.decompress)
+  encoded = {}
+  for name, (suffix, decompress) in decoders.items():
+    try:
+      with open(file_path + suffix, 'rb') as f:
+        data = f.read()
+    except OSError:
+      continue
+    try:
+      fresh = decompress(data) == body
+    except Exception:
+      fresh = False  # corrupt
+    if fresh:
+      encoded[name] = data
+    else:
+      print(f"Ignoring stale {file_path + suffix}; rebuild it with the asset")
+  return encoded
+
+def add_asset(path, file_path):
+  """Register file_path under the asset path `path` (e.g. js/index.js)"""
+  stem, ext = os.path.splitext(path)
+  with open(file_path, 'rb') as f:
+    body = f.read()
+  asset = StaticContent(body, ASSET_TYPES[ext], immutable=True, precompressed=read_precompressed(file_path, body))
+  hashed = f'{stem}.{asset.digest[:12]}{ext}'
+  _assets[hashed] = asset
+  _asset_paths[path] = hashed
+
+def plotly_package_bundle():
+  """Full plotly.min.js shipped with the plotly package, found without importing plotly"""
+  spec = importlib.util.find_spec('plotly')
+  if spec is None or not spec.submodule_search_locations:
+    return None
+  path = os.path.join(spec.submodule_search_locations[0], 'package_data', 'plotly.min.js')
+  return path if os.path.exists(path) else None
+
+def load_assets():
+  """Fingerprint the CSS/JS files under static/ so pages can link them at content-hashed URLs"""
+  for folder in ('css', 'js'):
+    for name in sorted(os.listdir(os.path.join(ASSET_DIR, folder))):
+      if os.path.splitext(name)[1] in ASSET_TYPES:
+        add_asset(f'{folder}/{name}', os.path.join(ASSET_DIR, folder, name))
+  # Charts need only scatter and bar traces: prefer the basic bundle (`npm run build:plotly`)
+  # and fall back to the full bundle of the installed plotly package, never the CDN
+  if not has_asset('js/plotly-basic.min.js'):
+    bundle = plotly_package_bundle()
+    if bundle:
+      add_asset('js/plotly.min.js', bundle)
+
+def asset_url(path):
+  """URL of a static/ asset that changes whenever its content does"""
+  return '/assets/' + _asset_paths[path]
+
+def has_asset(path):
+  return path in _asset_paths
+
+@app.route('/assets/<path:path>')
+def static_asset(path):
+  asset = _assets.get(path)
+  if asset is None:
+    return jsonify({"error": "Not found."}), 404
+  return asset.response()
+
+# The templates only reference assets: render them through Jinja once, not per request
+load_assets()
+if not has_asset('css/tailwind.css'):
+  print("static/css/tailwind.css is missing (build it with `npm run build:css`); pages fall back to the Tailwind CDN")
+with app.app_context():
+  INDEX_PAGE = StaticContent(render_template_string(HTML_TEMPLATE, asset_url=asset_url, has_asset=has_asset), 'text/html')
+  VIS_PAGE = StaticContent(render_template_string(VIS_TEMPLATE, asset_url=asset_url, has_asset=has_asset), 'text/html')
+
+
+@app.route('/')
+def index():
+  return INDEX_PAGE.response()
+
+
+# Styling shared by every chart; compact payloads leave it (and the template) to the client
+CHART_BASE_LAYOUT = dict(
+  hovermode='x unified', plot_bgcolor='#0f172a', paper_bgcolor='#1e293b',
+  font=dict(color='#cbd5e1'),
+  xaxis=dict(showgrid=True, gridwidth=1, gridcolor='#334155'),
+  yaxis=dict(showgrid=True, gridwidth=1, gridcolor='#334155')
+)
+_chart_layout = None  # (layout id, JSON body), built on first use
+
+def shared_chart_layout():
+  """The base layout plus the default Plotly template, encoded once and identified by a content hash"""
+  global _chart_layout
+  if _chart_layout is None:
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    layout = go.Layout(template=pio.templates[pio.templates.default], **CHART_BASE_LAYOUT)
+    body = pio.to_json(layout, validate=False)
+    _chart_layout = (hashlib.sha1(body.encode()).hexdigest()[:12], body)
+  return _chart_layout
+
+
+def json_object(fragments):
+  """Join pre-encoded JSON values into one JSON object without parsing them again"""
+  return '{' + ','.join(f'{json.dumps(key)}:{value}' for key, value in fragments.items()) + '}'
+
+
+def build_chart_figures():
+  """The visualization page's Plotly figures with styling only; build_charts fills in the data"""
+  # plotly is imported on first use: only the chart endpoints need it
+  import plotly.graph_objects as go
+  figures = {}
+  
+  # 1. HCI Trend
+  fig_hci = go.Figure()
+  fig_hci.add_trace(go.Scatter(
+    mode='lines+markers', name='HCI Trend',
+    line=dict(color='#fbbf24', width=3),
+    marker=dict(size=10, color='#fbbf24', line=dict(color='#f59e0b', width=2)),
+    fill='tozeroy', fillcolor='rgba(251, 191, 36, 0.2)',
+    hovertemplate='<b>%{x}</b><br>HCI: %{y:.1f}<extra></extra>'
+  ))
+  fig_hci.update_layout(
+    title='HCI Trend', xaxis_title='Day', yaxis_title='HCI Score',
+    height=350, margin=dict(l=50, r=50, t=60, b=50),
+    yaxis=dict(range=[0, 100])
+  )
+  figures['hci'] = fig_hci
+  
+  # 2. Temperature (bar colors depend on the number of days, so they are data)
+  fig_temp = go.Figure()
+  fig_temp.add_trace(go.Bar(name='Temperature',
+    marker=dict(line=dict(color='#334155', width=1)),
+    hovertemplate='<b>%{x}</b><br>Temperature: %{y:.1f}°C<extra></extra>'
+  ))
+  fig_temp.update_layout(
+    title='Temperature', xaxis_title='Day', yaxis_title='°C',
+    height=300, margin=dict(l=50, r=30, t=60, b=50),
+    showlegend=False
+  )
+  figures['temperature'] = fig_temp
+  
+  # 3. Humidity
+  fig_hum = go.Figure()
+  fig_hum.add_trace(go.Scatter(mode='lines+markers', name='Humidity',
+    line=dict(color='#06b6d4', width=3),
+    marker=dict(size=9, color='#06b6d4', line=dict(color='#0891b2', width=2)),
+    fill='tozeroy', fillcolor='rgba(6, 182, 212, 0.2)',
+    hovertemplate='<b>%{x}</b><br>Humidity: %{y:.0f}%<extra></extra>'
+  ))
+  fig_hum.update_layout(
+    title='Humidity', xaxis_title='Day', yaxis_title='%',
+    height=300, margin=dict(l=50, r=30, t=60, b=50),
+    yaxis=dict(range=[0, 100]), showlegend=False
+  )
+  figures['humidity'] = fig_hum
+  
+  # 4. Wind Speed
+  fig_wind = go.Figure()
+  fig_wind.add_trace(go.Bar(name='Wind Speed',
+    marker=dict(line=dict(color='#334155', width=1)),
+    hovertemplate='<b>%{x}</b><br>Wind Speed: %{y:.1f} kph<extra></extra>'
+  ))
+  fig_wind.update_layout(
+    title='Wind Speed', xaxis_title='Day', yaxis_title='kph',
+    height=300, margin=dict(l=50, r=30, t=60, b=50),
+    showlegend=False
+  )
+  figures['wind'] = fig_wind
+  
+  # 5. Monthly Temperature
+  fig_monthly = go.Figure()
+  fig_monthly.add_trace(go.Scatter(mode='lines+markers', name='Daily Temperature',
+    line=dict(color='#f97316', width=3), fill='tozeroy', fillcolor='rgba(249, 115, 22, 0.2)',
+    marker=dict(size=6, color='#f97316'),
+    hovertemplate='<b>%{x}</b><br>Temperature: %{y:.1f}°C<extra></extra>'
+  ))
+  fig_monthly.update_layout(
+    title='Monthly Temperature Trend', xaxis_title='Date', yaxis_title='°C',
+    height=350, margin=dict(l=50, r=50, t=60, b=50),
+    showlegend=False
+  )
+  figures['monthly'] = fig_monthly
+  
+  return figures
+
+
+_chart_skeletons = {}  # compact flag -> {chart name: figure dict}
+
+def chart_skeletons(compact=False):
+  """Figure dicts from build_chart_figures, validated by Plotly once per payload mode.
+
+  Compact skeletons carry only their own layout keys and the id of the shared
+  layout the client merges them into; full ones embed the base layout and template.
+  """
+  skeletons = _chart_skeletons.get(compact)
+  if skeletons is None:
+    skeletons = {}
+    for name, fig in build_chart_figures().items():
+      if compact:
+        fig.layout.template = None
+        skeletons[name] = dict(fig.to_plotly_json(), layout_id=shared_chart_layout()[0])
+      else:
+        fig.update_layout(CHART_BASE_LAYOUT)
+        skeletons[name] = fig.to_plotly_json()
+    _chart_skeletons[compact] = skeletons
+  return skeletons
+
+
+def preload_charts():
+  """Import plotly and build the chart skeletons now, e.g. in a preforking master (PRELOAD_CHARTS=1)"""
+  for compact in (False, True):
+    chart_skeletons(compact)
+
+
+def figure_json(skeleton, **data):
+  """Encode a skeleton with its trace's data filled in, skipping Plotly's validators"""
+  import plotly.io as pio
+  return pio.json.to_json_plotly(dict(skeleton, data=[dict(skeleton['data'][0], **data)]))
+
+
+# Upper bound on points per line trace, whatever width the client asks for
+CHART_MAX_POINTS = 2000
+CHART_WIDTH_STEP = 100  # requested widths are rounded up to this so cache keys stay few
+
+def lttb_indices(x, y, max_points):
+  """Indices of the points Largest-Triangle-Three-Buckets keeps when reducing (x, y) to max_points.
+
+  The first and last points are always kept; every bucket in between keeps
+  the point forming the largest triangle with the previously kept point and
+  the average of the next bucket. x must be increasing and y free of NaN.
+  """
+  n = len(y)
+  if max_points >= n or max_points < 3:
+    return np.arange(n)
+  x = np.asarray(x, dtype=float)
+  y = np.asarray(y, dtype=float)
+  # Interior points 1..n-2 split into max_points-2 non-empty buckets [edges[i], edges[i+1])
+  edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+  sizes = np.diff(edges)
+  avg_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / sizes, x[-1])
+  avg_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / sizes, y[-1])
+  keep = np.empty(max_points, dtype=int)
+  keep[0], keep[-1] = 0, n - 1
+  a = 0
+  for i in range(max_points - 2):
+    lo, hi = edges[i], edges[i + 1]
+    # Twice the triangle area; the constant factor does not change the argmax
+    area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+    a = lo + int(np.argmax(area))
+    keep[i + 1] = a
+  return keep
+
+
+def downsample_series(x, y, max_points):
+  """(x, y) as lists with at most max_points points picked by LTTB; categorical x is spaced by position"""
+  if len(y) <= max_points:
+    return list(x), list(y)
+  positions = x if all(isinstance(v, (int, float)) for v in x) else np.arange(len(x))
+  keep = lttb_indices(positions, y, max_points)
+  return [x[i] for i in keep], [y[i] for i in keep]
+
+
+def chart_points(width=None):
+  """Points per line trace for a chart `width` pixels wide (one per pixel, capped)"""
+  try:
+    width = int(width)
+  except (TypeError, ValueError):
+    return CHART_MAX_POINTS
+  width = -(-max(width, 1) // CHART_WIDTH_STEP) * CHART_WIDTH_STEP
+  return min(width, CHART_MAX_POINTS)
+
+
+def build_charts(weather, compact=False, max_points=CHART_MAX_POINTS):
+  """Build the visualization page's Plotly figures from one WeatherResult.
+
+  Returns {chart name: figure JSON string}; responses are assembled from these
+  fragments with json_object so each figure is encoded exactly once. Only the
+  data is per request; layouts come from the cached chart_skeletons. Line
+  traces longer than max_points are downsampled with LTTB.
+  """
+  # Current values first, then one point per forecast day (defaults fill gaps)
+  labels = ['Today'] + [f.date or '' for f in weather.forecast]
+  current_hci = weather.hci if weather.hci is not None else 50.0
+  hci_values = [current_hci] + [f.possible_hci if f.possible_hci is not None else 50.0 for f in weather.forecast]
+  temp_values = [weather.avgtemp_c] + [f.avgtemp_c if f.avgtemp_c is not None else 20.0 for f in weather.forecast]
+  humidity_values = [weather.humidity] + [f.humidity if f.humidity is not None else 50.0 for f in weather.forecast]
+  wind_values = [weather.wind_kph] + [f.wind_kph if f.wind_kph is not None else 10.0 for f in weather.forecast]
+  
+  skeletons = chart_skeletons(compact)
+  charts = {}
+  x, y = downsample_series(labels, hci_values, max_points)
+  charts['hci'] = figure_json(skeletons['hci'], x=x, y=y)
+  
+  temp = skeletons['temperature']
+  colors = ['#10b981' if i == 0 else '#60a5fa' for i in range(len(labels))]
+  charts['temperature'] = figure_json(temp, x=labels, y=temp_values,
+    marker=dict(temp['data'][0]['marker'], color=colors))
+  
+  x, y = downsample_series(labels, humidity_values, max_points)
+  charts['humidity'] = figure_json(skeletons['humidity'], x=x, y=y)
+  
+  wind = skeletons['wind']
+  colors_wind = ['#10b981' if i == 0 else '#34d399' for i in range(len(labels))]
+  charts['wind'] = figure_json(wind, x=labels, y=wind_values,
+    marker=dict(wind['data'][0]['marker'], color=colors_wind))
+  
+  # Monthly Temperature: daily means of the observations recorded for this location
+  history = _observations.daily(weather.payload['location_name'], days=30)
+  recorded = ~np.isnan(history['temp_c'])
+  dates = [time.strftime('%Y-%m-%d', time.gmtime(day * SECONDS_PER_DAY)) for day in history['day'][recorded]]
+  x, y = downsample_series(dates, np.round(history['temp_c'][recorded], 1).tolist(), max_points)
+  charts['monthly'] = figure_json(skeletons['monthly'], x=x, y=y)
+  
+  return charts
+
+
+def chart_request_params():
+  data = request.get_json() or {}
+  return (data.get('location', 'London'), data.get('profile', 'general'), bool(data.get('compact')),
+          chart_points(data.get('width')))
+
+
+def cached_charts(location, profile, compact, max_points, weather):
+  """Chart JSON for one forecast snapshot; a refreshed forecast entry makes the cached copy a miss"""
+  key = (location.strip().lower(), profile, compact, max_points)
+  body = _chart_cache.get(key, weather.fetched_at)
+  if body is None:
+    body = json_object(build_charts(weather, compact, max_points))
+    _chart_cache.put(key, body, weather.fetched_at)
+  return body
+
+
+@app.route('/api/generate_charts', methods=['POST'])
+def generate_charts():
+  """Generate interactive Plotly charts as JSON"""
+  try:
+    location, profile, compact, max_points = chart_request_params()
+    try:
+      weather = fetch_weather(location, forecast_days=3, include_aqi=True, profile=profile)
+    except WeatherError as e:
+      return jsonify({'error': e.message}), 400
+    return json_response(cached_charts(location, profile, compact, max_points, weather))
+  except Exception as e:
+    return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/dashboard', methods=['POST'])
+def dashboard():
+  """Weather result and every chart for the visualization page from a single fetch"""
+  try:
+    location, profile, compact, max_points = chart_request_params()
+    try:
+      weather = fetch_weather(location, forecast_days=3, include_aqi=True, profile=profile)
+    except WeatherError as e:
+      return jsonify({'error': e.message}), e.status
+    return json_response(json_object({
+      'weather': app.json.dumps(weather.payload),
+      'charts': cached_charts(location, profile, compact, max_points, weather)
+    }))
+  except Exception as e:
+    return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/chart_layout/<layout_id>')
+def chart_layout(layout_id):
+  """Shared layout for compact chart payloads; ids are content hashes, so cache them forever"""
+  current_id, body = shared_chart_layout()
+  if layout_id != current_id:
+    return jsonify({"error": "Unknown layout."}), 404
+  resp = json_response(body)
+  resp.set_etag(current_id)
+  resp.cache_control.public = True
+  resp.cache_control.max_age = 31536000
+  resp.cache_control.immutable = True
+  return resp.make_conditional(request)
+
+
+@app.route('/visualization')
+def visualization():
+  return VIS_PAGE.response()
+
+if os.environ.get('PRELOAD_CHARTS') == '1':
+  preload_charts()
+
+if __name__ == '__main__':
+    # Using host='0.0.0.0' for environment compatibility
+    print("---------------------------------------------------------------------")
+    print("Flask Application 'Weather.AI' is starting...")
+    print("Access the dashboard at: http://127.0.0.1:5000/")
+    print("---------------------------------------------------------------------")
+    start_city_loader()
+    app.run(debug=True, host='0.0.0.0')
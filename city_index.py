@@ -0,0 +1,864 @@
+import csv
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+import numpy as np
+
+
+def fold(text):
+  """Normalize a city name or query for matching."""
+  return (text or '').strip().lower()
+
+
+# ----- City store -----
+# Binary index layout: header, then one 8-byte aligned array per section
+INDEX_MAGIC = b'HCIC'
+INDEX_VERSION = 3
+_INDEX_HEADER = struct.Struct('<4sII')
+_INDEX_SECTION = struct.Struct('<QQ')  # byte offset, item count
+_INDEX_SECTIONS = [
+  ('string_offsets', '<u4'),
+  ('string_blob', 'u1'),
+  ('city', '<i4'),
+  ('city_ascii', '<i4'),
+  ('country', '<i4'),
+  ('iso2', '<i4'),
+  ('admin_name', '<i4'),
+  ('lat', '<f8'),
+  ('lng', '<f8'),
+  ('population', '<f8'),
+  ('name_variant', '<i4'),
+  ('name_order', '<i4'),
+]
+
+
+_TEXT_COLUMNS = ('city', 'city_ascii', 'country', 'iso2', 'admin_name')
+
+
+def _to_float(value):
+  try:
+    return float(value)
+  except (TypeError, ValueError):
+    return 0.0
+
+
+class MappedStrings(Sequence):
+  """String table backed by a UTF-8 blob and an offsets array; decodes on access."""
+
+  def __init__(self, offsets, blob):
+    self.offsets = offsets
+    self.blob = blob
+
+  def __len__(self):
+    return len(self.offsets) - 1
+
+  def __getitem__(self, idx):
+    if idx < 0 or idx >= len(self):
+      raise IndexError(idx)
+    return self.blob[self.offsets[idx]:self.offsets[idx + 1]].tobytes().decode('utf-8')
+
+
+class CityStore:
+  """Columnar, read-only table of cities addressed by integer id.
+
+  Text columns hold int32 offsets into one table of interned strings (a
+  country name is stored once, not once per city), and coordinates and
+  population are NumPy float arrays parsed at load time. Search, geo and
+  validation code share a single instance and refer to cities by id.
+
+  Ids are assigned in descending population order, so any list of ids sorted
+  ascending is already ranked by population.
+  """
+
+  def __init__(self, strings, city, city_ascii, country, iso2, admin_name, lat, lng, population,
+               name_entries=None):
+    self.strings = strings
+    self.city = city
+    self.city_ascii = city_ascii
+    self.country = country
+    self.iso2 = iso2
+    self.admin_name = admin_name
+    self.lat = lat
+    self.lng = lng
+    self.population = population
+    self._name_entries = name_entries
+    self._folded = None
+    self._names = None
+    self._partitions = None
+    self._mmap = None
+
+  @classmethod
+  def from_rows(cls, rows):
+    """Build a store from an iterable of worldcities.csv dict rows."""
+    strings = []
+    interned = {}
+
+    def intern(text):
+      idx = interned.get(text)
+      if idx is None:
+        idx = interned[text] = len(strings)
+        strings.append(text)
+      return idx
+
+    city, city_ascii, country, iso2, admin_name, lat, lng, population = [], [], [], [], [], [], [], []
+    for row in rows:
+      city.append(intern(row.get('city') or ''))
+      city_ascii.append(intern(row.get('city_ascii') or ''))
+      country.append(intern(row.get('country') or ''))
+      iso2.append(intern(row.get('iso2') or ''))
+      admin_name.append(intern(row.get('admin_name') or ''))
+      lat.append(_to_float(row.get('lat')))
+      lng.append(_to_float(row.get('lng')))
+      population.append(_to_float(row.get('population')))
+    population = np.array(population, dtype=np.float64)
+    order = np.argsort(-population, kind='stable')
+    return cls(
+      strings,
+      np.array(city, dtype=np.int32)[order],
+      np.array(city_ascii, dtype=np.int32)[order],
+      np.array(country, dtype=np.int32)[order],
+      np.array(iso2, dtype=np.int32)[order],
+      np.array(admin_name, dtype=np.int32)[order],
+      np.array(lat, dtype=np.float64)[order],
+      np.array(lng, dtype=np.float64)[order],
+      population[order],
+    )
+
+  @classmethod
+  def from_csv(cls, path):
+    with open(path, 'r', encoding='utf-8') as f:
+      return cls.from_rows(csv.DictReader(f))
+
+  @classmethod
+  def from_index(cls, path):
+    """Memory-map an index written by `write_index`.
+
+    Numeric columns are zero-copy views of the mapping, so they load in
+    constant time and their pages are shared by every process that maps the
+    same file. On Windows, where a mapped file can't be replaced (which
+    `write_index` does while workers run), the file is read into memory
+    instead. Raises ValueError if the file is not a current-version index.
+    """
+    with open(path, 'rb') as f:
+      if os.name == 'nt':
+        mm = f.read()
+      else:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+      magic, version, n_sections = _INDEX_HEADER.unpack_from(mm, 0)
+      if magic != INDEX_MAGIC or version != INDEX_VERSION or n_sections != len(_INDEX_SECTIONS):
+        raise ValueError(f"Unsupported city index format in {path}")
+      arrays = {}
+      pos = _INDEX_HEADER.size
+      for name, dtype in _INDEX_SECTIONS:
+        offset, count = _INDEX_SECTION.unpack_from(mm, pos)
+        pos += _INDEX_SECTION.size
+        arrays[name] = np.frombuffer(mm, dtype=dtype, count=count, offset=offset)
+    except (struct.error, ValueError):
+      if isinstance(mm, mmap.mmap):
+        mm.close()
+      raise ValueError(f"Unsupported city index format in {path}")
+    store = cls(
+      MappedStrings(arrays['string_offsets'], arrays['string_blob']),
+      arrays['city'], arrays['city_ascii'], arrays['country'], arrays['iso2'], arrays['admin_name'],
+      arrays['lat'], arrays['lng'], arrays['population'],
+      name_entries=(arrays['name_variant'], arrays['name_order']),
+    )
+    store._mmap = mm
+    return store
+
+  @classmethod
+  def empty(cls):
+    return cls.from_rows(())
+
+  def select(self, ids):
+    """Return a new store holding only `ids` (ascending), with a compacted string table."""
+    ids = np.asarray(ids, dtype=np.int64)
+    text_columns = [getattr(self, name)[ids] for name in _TEXT_COLUMNS]
+    used = np.unique(np.concatenate(text_columns)) if len(ids) else np.zeros(0, dtype=np.int64)
+    remap = {old: new for new, old in enumerate(used.tolist())}
+    lookup = np.vectorize(remap.__getitem__, otypes=[np.int32]) if len(ids) else None
+    return CityStore(
+      [self.strings[i] for i in used.tolist()],
+      *[lookup(col) if lookup else col.astype(np.int32) for col in text_columns],
+      np.array(self.lat[ids]), np.array(self.lng[ids]), np.array(self.population[ids]),
+    )
+
+  def __len__(self):
+    return len(self.city)
+
+  def city_name(self, city_id):
+    return self.strings[self.city[city_id]]
+
+  def country_name(self, city_id):
+    return self.strings[self.country[city_id]]
+
+  def label(self, city_id):
+    """Display string "City, Country" for a city id."""
+    return f"{self.city_name(city_id)}, {self.country_name(city_id)}"
+
+  def _folded_strings(self):
+    if self._folded is None:
+      self._folded = [fold(text) for text in self.strings]
+    return self._folded
+
+  @property
+  def name_entries(self):
+    """Name variants sorted by folded text, as aligned (string id, city id) arrays.
+
+    Each city contributes its `city_ascii` name and, when it folds
+    differently, its `city` name. Ties are broken by city id, so the cities
+    sharing a prefix form one contiguous range.
+    """
+    if self._name_entries is None:
+      folded = self._folded_strings()
+      entries = []
+      for city_id, (a, c) in enumerate(zip(self.city_ascii.tolist(), self.city.tolist())):
+        entries.append((folded[a], city_id, a))
+        if folded[c] != folded[a]:
+          entries.append((folded[c], city_id, c))
+      entries.sort()
+      self._name_entries = (
+        np.array([e[2] for e in entries], dtype=np.int32),
+        np.array([e[1] for e in entries], dtype=np.int32),
+      )
+    return self._name_entries
+
+  def all_names(self):
+    """Folded name variants for every city, indexed by id."""
+    if self._names is None:
+      folded = self._folded_strings()
+      self._names = [tuple({folded[a], folded[c]})
+                     for a, c in zip(self.city_ascii.tolist(), self.city.tolist())]
+    return self._names
+
+  def _partition_map(self):
+    """Group city ids by country and by (country, admin region).
+
+    Countries are keyed by folded ISO2 code; `aliases` resolves folded
+    country names and codes to that key.
+    """
+    if self._partitions is None:
+      folded = self._folded_strings()
+      countries, regions, aliases = {}, {}, {}
+      for city_id, (code, name, admin) in enumerate(zip(
+          self.iso2.tolist(), self.country.tolist(), self.admin_name.tolist())):
+        key = folded[code] or folded[name]
+        aliases[folded[name]] = key
+        aliases[key] = key
+        countries.setdefault(key, []).append(city_id)
+        regions.setdefault((key, folded[admin]), []).append(city_id)
+      self._partitions = {
+        'country': {k: np.array(v, dtype=np.int32) for k, v in countries.items()},
+        'region': {k: np.array(v, dtype=np.int32) for k, v in regions.items()},
+        'aliases': aliases,
+      }
+    return self._partitions
+
+  def resolve_partitions(self, countries=(), regions=()):
+    """Return partition keys for country (name or ISO2) and admin region filters.
+
+    Regions narrow the selected countries, or match every country when none
+    is given. Keys are ('country', iso2) or ('region', iso2, admin); unknown
+    names resolve to nothing.
+    """
+    parts = self._partition_map()
+    codes = {parts['aliases'][fold(c)] for c in countries if fold(c) in parts['aliases']}
+    if countries and not codes:
+      return []
+    if regions:
+      wanted = {fold(r) for r in regions}
+      return [('region',) + key for key in parts['region']
+              if key[1] in wanted and (not countries or key[0] in codes)]
+    return [('country', code) for code in sorted(codes)]
+
+  def partition_ids(self, key):
+    """City ids (ascending) of a key returned by `resolve_partitions`."""
+    parts = self._partition_map()
+    if key[0] == 'country':
+      return parts['country'].get(key[1], np.zeros(0, dtype=np.int32))
+    return parts['region'].get(key[1:], np.zeros(0, dtype=np.int32))
+
+  def select_countries(self, countries):
+    """Return a new store holding only the cities of `countries` (names or ISO2 codes)."""
+    keys = self.resolve_partitions(countries)
+    ids = np.sort(np.concatenate([self.partition_ids(k) for k in keys])) if keys else []
+    return self.select(ids)
+
+
+def write_index(store, path):
+  """Compile `store` into a versioned binary index file at `path`.
+
+  The file is written next to its destination and renamed into place, so a
+  process mapping the old file never sees a partially written one (and
+  keeps its mapping of the old file until it reloads).
+  """
+  encoded = [text.encode('utf-8') for text in store.strings]
+  offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+  offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+  arrays = {
+    'string_offsets': offsets,
+    'string_blob': np.frombuffer(b''.join(encoded), dtype='u1'),
+    'city': store.city,
+    'city_ascii': store.city_ascii,
+    'country': store.country,
+    'iso2': store.iso2,
+    'admin_name': store.admin_name,
+    'lat': store.lat,
+    'lng': store.lng,
+    'population': store.population,
+    'name_variant': store.name_entries[0],
+    'name_order': store.name_entries[1],
+  }
+  pos = _INDEX_HEADER.size + _INDEX_SECTION.size * len(_INDEX_SECTIONS)
+  table = []
+  for name, dtype in _INDEX_SECTIONS:
+    pos = (pos + 7) // 8 * 8
+    arrays[name] = np.ascontiguousarray(arrays[name], dtype=dtype)
+    table.append((pos, len(arrays[name])))
+    pos += arrays[name].nbytes
+  tmp_path = f"{path}.tmp"
+  with open(tmp_path, 'wb') as f:
+    f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(_INDEX_SECTIONS)))
+    for offset, count in table:
+      f.write(_INDEX_SECTION.pack(offset, count))
+    for (name, _), (offset, _) in zip(_INDEX_SECTIONS, table):
+      f.write(b'\0' * (offset - f.tell()))
+      f.write(arrays[name].tobytes())
+  os.replace(tmp_path, path)
+
+
+# ----- City search indexes -----
+
+def ngrams(text, n):
+  """Return the set of distinct n-grams of `text`."""
+  return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _contains(posting, city_id):
+  """Membership test on a sorted posting list."""
+  pos = bisect_left(posting, city_id)
+  return pos < len(posting) and posting[pos] == city_id
+
+
+class PrefixIndex:
+  """Sorted name keys for ranked prefix lookups.
+
+  Uses the store's precomputed `name_entries`, so building it only folds the
+  keys. Cities matching a prefix form one contiguous range found by binary
+  search; ids in the range are sorted in C and, because ids follow
+  population, come out already ranked.
+  """
+
+  def __init__(self, store, ids=None):
+    """Index every city in `store`, or only `ids` when given."""
+    variants, self.ids = store.name_entries
+    if ids is not None:
+      keep = np.isin(self.ids, ids)
+      variants, self.ids = variants[keep], self.ids[keep]
+    folded = store._folded_strings()
+    self.keys = [folded[v] for v in variants.tolist()]
+
+  def search(self, query):
+    """Return ids of cities named exactly `query` and of the other cities starting with it.
+
+    Both lists are in population order; callers can stop once they have enough.
+    """
+    query = fold(query)
+    lo = bisect_left(self.keys, query)
+    exact_hi = bisect_right(self.keys, query, lo)
+    hi = bisect_left(self.keys, query + '\U0010ffff', exact_hi)
+    exact = np.unique(self.ids[lo:exact_hi])
+    prefix = np.setdiff1d(self.ids[exact_hi:hi], exact)
+    return exact.tolist(), prefix.tolist()
+
+
+class TrigramIndex:
+  """Inverted n-gram index for substring lookups over city names.
+
+  Every city contributes the trigrams of its folded `city` and `city_ascii`
+  names. A query is answered by intersecting the posting lists of its
+  trigrams (rarest first) and verifying each surviving candidate, so the
+  cost depends on the rarest trigram instead of the dataset size. Two
+  character queries have no trigram and use a bigram table instead.
+  """
+
+  def __init__(self, names, ids=None):
+    """`names` is a sequence where item i is a tuple of folded names for city id i.
+
+    Only `ids` (ascending) are indexed when given.
+    """
+    self.names = names
+    trigrams = {}
+    bigrams = {}
+    for city_id in (range(len(names)) if ids is None else ids):
+      variants = names[city_id]
+      grams3 = set()
+      grams2 = set()
+      for name in variants:
+        grams3 |= ngrams(name, 3)
+        grams2 |= ngrams(name, 2)
+      for g in grams3:
+        trigrams.setdefault(g, []).append(city_id)
+      for g in grams2:
+        bigrams.setdefault(g, []).append(city_id)
+    # ids are appended in increasing order, so every posting list is sorted
+    self.trigrams = trigrams
+    self.bigrams = bigrams
+
+  def candidates(self, query):
+    """Return sorted city ids whose posting lists contain every n-gram of `query`."""
+    if len(query) < 2:
+      return []
+    if len(query) == 2:
+      return list(self.bigrams.get(query, ()))
+    postings = []
+    for g in ngrams(query, 3):
+      posting = self.trigrams.get(g)
+      if not posting:
+        return []
+      postings.append(posting)
+    postings.sort(key=len)
+    result = postings[0]
+    for posting in postings[1:]:
+      result = [city_id for city_id in result if _contains(posting, city_id)]
+      if not result:
+        break
+    return result
+
+  def search(self, query):
+    """Yield ids of cities where `query` is a substring of one of their names, in id order."""
+    query = fold(query)
+    for city_id in self.candidates(query):
+      if any(query in name for name in self.names[city_id]):
+        yield city_id
+
+
+def edit_distance(a, b, max_distance):
+  """Optimal string alignment distance, or `max_distance + 1` once it is exceeded."""
+  if abs(len(a) - len(b)) > max_distance:
+    return max_distance + 1
+  prev2 = None
+  prev = list(range(len(b) + 1))
+  for i in range(1, len(a) + 1):
+    cur = [i] + [0] * len(b)
+    row_min = i
+    for j in range(1, len(b) + 1):
+      cost = 0 if a[i - 1] == b[j - 1] else 1
+      v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+      if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+        v = min(v, prev2[j - 2] + 1)
+      cur[j] = v
+      row_min = min(row_min, v)
+    if row_min > max_distance:
+      return max_distance + 1
+    prev2, prev = prev, cur
+  return min(prev[-1], max_distance + 1)
+
+
+def deletes(word, max_distance):
+  """Return every string reachable from `word` by removing up to `max_distance` characters."""
+  result = {word}
+  frontier = {word}
+  for _ in range(max_distance):
+    nxt = set()
+    for w in frontier:
+      # Down to '' too: names no longer than the bound match any equally short query
+      for i in range(len(w)):
+        nxt.add(w[:i] + w[i + 1:])
+    result |= nxt
+    frontier = nxt
+  return result
+
+
+class FuzzyIndex:
+  """Symmetric-delete dictionary for typo-tolerant city lookups.
+
+  Each distinct folded name is stored under every string obtained by deleting
+  up to `max_distance` characters from its first `prefix_length` characters.
+  A query generates the same deletes of its own prefix, so all names within
+  the edit bound share at least one key with it and are found with a handful
+  of dictionary lookups; candidates are then verified with `edit_distance`.
+  Limiting deletes to the prefix keeps the dictionary small and the per-query
+  work independent of the dataset size.
+  """
+
+  def __init__(self, names, ids=None, max_distance=2, prefix_length=7):
+    """`names` is a sequence where item i is a tuple of folded names for city id i.
+
+    Only `ids` (ascending) are indexed when given.
+    """
+    self.max_distance = max_distance
+    self.prefix_length = prefix_length
+    words = {}
+    for city_id in (range(len(names)) if ids is None else ids):
+      for name in names[city_id]:
+        if name:
+          words.setdefault(name, []).append(city_id)
+    self.vocab = list(words)
+    self.word_ids = [words[w] for w in self.vocab]
+    self.deletes = {}
+    for idx, word in enumerate(self.vocab):
+      for key in deletes(word[:prefix_length], max_distance):
+        self.deletes.setdefault(key, []).append(idx)
+
+  def search(self, query, max_distance=None):
+    """Return `(distance, city_id)` pairs within the edit bound, closest first."""
+    query = fold(query)
+    if max_distance is None:
+      max_distance = self.max_distance
+    max_distance = min(max_distance, self.max_distance)
+    if not query:
+      return []
+    checked = set()
+    matches = []
+    for key in deletes(query[:self.prefix_length], max_distance):
+      for idx in self.deletes.get(key, ()):
+        if idx in checked:
+          continue
+        checked.add(idx)
+        dist = edit_distance(query, self.vocab[idx], max_distance)
+        if dist <= max_distance:
+          matches.extend((dist, city_id) for city_id in self.word_ids[idx])
+    matches.sort()
+    return matches
+
+
+class FilteredFuzzyIndex:
+  """A FuzzyIndex over all cities whose results are restricted to some ids."""
+
+  def __init__(self, index, ids):
+    self.index = index
+    self.ids = frozenset(ids)
+
+  def search(self, query, max_distance=None):
+    return [(dist, city_id) for dist, city_id in self.index.search(query, max_distance) if city_id in self.ids]
+
+
+class CityPartition:
+  """Search indexes over all cities of a store or over one partition of them.
+
+  The prefix and substring indexes are built up front. The fuzzy index is
+  large (tens of MB) and slow to build, so it is built once, under the
+  partition's own lock, on first use; a partition of a subset of cities
+  filters the results of the `full` partition's index instead of building
+  its own.
+  """
+
+  def __init__(self, store, ids=None, full=None):
+    self.store = store
+    self.ids = None if ids is None else np.asarray(ids).tolist()
+    self.prefix = PrefixIndex(store, ids)
+    self.trigram = TrigramIndex(store.all_names(), self.ids)
+    self._lock = threading.Lock()
+    self._full = full
+    self._fuzzy = None
+
+  @property
+  def fuzzy(self):
+    if self._fuzzy is None:
+      with self._lock:
+        if self._fuzzy is None:
+          if self._full is not None and self.ids is not None:
+            self._fuzzy = FilteredFuzzyIndex(self._full.fuzzy, self.ids)
+          else:
+            self._fuzzy = FuzzyIndex(self.store.all_names(), self.ids)
+    return self._fuzzy
+
+  def search(self, query):
+    """Return (exact, prefix, substring) id iterables, each in population order."""
+    exact, prefix = self.prefix.search(query)
+    return exact, prefix, self.trigram.search(query)
+
+
+def search_partitions(partitions, query):
+  """Yield city ids matching `query` across disjoint partitions, best first.
+
+  All exact matches come first, then prefix, then substring matches; within a
+  tier the partitions are merged by id, i.e. by population.
+  """
+  tiers = zip(*(part.search(query) for part in partitions))
+  for tier in tiers:
+    yield from heapq.merge(*tier)
+
+
+# ----- Spatial index -----
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_vectors(lat, lng):
+  """Convert degree coordinates to points on the unit sphere (n x 3)."""
+  lat = np.radians(np.asarray(lat, dtype=np.float64))
+  lng = np.radians(np.asarray(lng, dtype=np.float64))
+  cos_lat = np.cos(lat)
+  return np.stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)], axis=-1)
+
+
+class GeoIndex:
+  """KD-tree over city coordinates for nearest-city lookups.
+
+  Cities are indexed as 3-D unit vectors, where straight-line distance is
+  monotonic in great-circle distance, so there is no special handling for
+  the poles or the antimeridian. Points are reordered so every leaf is a
+  contiguous slice, letting leaves be scanned with one NumPy expression.
+  """
+
+  LEAF_SIZE = 32
+
+  def __init__(self, lat, lng):
+    points = to_unit_vectors(lat, lng)
+    order = np.arange(len(points))
+    # node arrays: split axis (-1 for leaves), split value, children, slice
+    self.axis, self.split, self.left, self.right, self.start, self.end = [], [], [], [], [], []
+    if len(points):
+      self._build(points, order, 0, len(points))
+    self.ids = order
+    self.points = points[order]
+
+  def _new_node(self, start, end):
+    for column, value in ((self.axis, -1), (self.split, 0.0), (self.left, -1),
+                          (self.right, -1), (self.start, start), (self.end, end)):
+      column.append(value)
+    return len(self.axis) - 1
+
+  def _build(self, points, order, start, end):
+    node = self._new_node(start, end)
+    if end - start <= self.LEAF_SIZE:
+      return node
+    chunk = points[order[start:end]]
+    axis = int(np.argmax(chunk.max(axis=0) - chunk.min(axis=0)))
+    mid = (end - start) // 2
+    part = np.argpartition(chunk[:, axis], mid)
+    order[start:end] = order[start:end][part]
+    self.axis[node] = axis
+    self.split[node] = float(points[order[start + mid], axis])
+    self.left[node] = self._build(points, order, start, start + mid)
+    self.right[node] = self._build(points, order, start + mid, end)
+    return node
+
+  def nearest(self, lat, lng, k=1):
+    """Return up to `k` `(distance_km, city_id)` pairs, closest first."""
+    if not self.axis or k < 1:
+      return []
+    phi, lam = math.radians(lat), math.radians(lng)
+    query = (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+    query_array = np.array(query)
+    best = []  # (-squared chord distance, city_id) max-heap of size k
+    stack = [0]
+    while stack:
+      node = stack.pop()
+      axis = self.axis[node]
+      if axis < 0:
+        start, end = self.start[node], self.end[node]
+        d2 = ((self.points[start:end] - query_array) ** 2).sum(axis=1)
+        for offset in (np.argsort(d2)[:k] if k > 1 else (int(np.argmin(d2)),)):
+          item = (-float(d2[offset]), int(self.ids[start + offset]))
+          if len(best) < k:
+            heapq.heappush(best, item)
+          elif item[0] > best[0][0]:
+            heapq.heapreplace(best, item)
+          else:
+            break
+        continue
+      diff = query[axis] - self.split[node]
+      near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+      if len(best) < k or diff * diff < -best[0][0]:
+        stack.append(far)
+      stack.append(near)
+    best.sort(reverse=True)
+    return [(2.0 * math.asin(min(math.sqrt(-d2) / 2.0, 1.0)) * EARTH_RADIUS_KM, city_id)
+            for d2, city_id in best]
+
+
+# ----- Location hierarchy -----
+class LocationTree:
+  """Country -> admin region -> city hierarchy for cascading location dropdowns.
+
+  Every response the dropdown endpoints can return is serialized once at
+  build time together with a strong ETag, so serving one is a dict lookup.
+  Countries may be given by name or ISO2 code; lookups are case-insensitive.
+  """
+
+  def __init__(self, store):
+    tree = {}
+    for country, admin, city in zip(store.country.tolist(), store.admin_name.tolist(), store.city.tolist()):
+      tree.setdefault(country, {}).setdefault(admin, set()).add(city)
+    strings = store.strings
+    self.aliases = {}
+    self.payloads = {}
+    self.payloads[()] = self._encode(sorted(strings[c] for c in tree if strings[c]))
+    for country, regions in tree.items():
+      name = strings[country]
+      if not name:
+        continue
+      key = fold(name)
+      self.aliases[key] = key
+      self.payloads[(key,)] = self._encode(sorted(strings[a] for a in regions if strings[a]))
+      for admin, cities in regions.items():
+        if strings[admin]:
+          self.payloads[(key, fold(strings[admin]))] = self._encode(sorted({strings[c] for c in cities}))
+    for code, country in zip(store.iso2.tolist(), store.country.tolist()):
+      if strings[code] and strings[country]:
+        self.aliases.setdefault(fold(strings[code]), fold(strings[country]))
+    self.empty = self._encode([])
+
+  @staticmethod
+  def _encode(items):
+    body = json.dumps(items, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return body, hashlib.sha1(body).hexdigest()[:20]
+
+  def lookup(self, country=None, state=None):
+    """Return `(body, etag)`: countries, a country's regions, or a region's cities."""
+    if country is None:
+      return self.payloads[()]
+    key = self.aliases.get(fold(country))
+    if key is None:
+      return self.empty
+    path = (key,) if state is None else (key, fold(state))
+    return self.payloads.get(path, self.empty)
+
+
+class CityIndexes:
+  """A city store together with every index derived from it.
+
+  The app holds one instance and replaces it wholesale on reload. A request
+  that grabbed the old instance keeps using it consistently, and the new one
+  is only published after `warm` has built its default indexes. Partitions,
+  the geo index and the location tree are built lazily under a per-instance
+  lock, so each is constructed once and only becomes visible when complete.
+  Fuzzy indexes take seconds, so each partition builds its own under a
+  separate lock rather than holding up the others.
+  """
+
+  def __init__(self, store, generation=0, source=None):
+    self.store = store
+    self.generation = generation
+    self.source = source
+    self._partitions = {}
+    self._geo = None
+    self._locations = None
+    self._lock = threading.RLock()
+
+  def partition(self, key=None):
+    """Search indexes for all cities (None) or a `CityStore.resolve_partitions` key."""
+    part = self._partitions.get(key)
+    if part is not None:
+      return part
+    with self._lock:
+      part = self._partitions.get(key)
+      if part is None:
+        if key is None:
+          part = CityPartition(self.store)
+        else:
+          part = CityPartition(self.store, self.store.partition_ids(key), full=self.partition())
+        self._partitions[key] = part
+      return part
+
+  @property
+  def geo(self):
+    if self._geo is None:
+      with self._lock:
+        if self._geo is None:
+          self._geo = GeoIndex(self.store.lat, self.store.lng)
+    return self._geo
+
+  @property
+  def locations(self):
+    if self._locations is None:
+      with self._lock:
+        if self._locations is None:
+          self._locations = LocationTree(self.store)
+    return self._locations
+
+  def warm(self):
+    """Build the default search partition and the geo index; the fuzzy index follows in the background."""
+    part = self.partition()
+    self.geo
+    threading.Thread(target=lambda: part.fuzzy, name='fuzzy-index', daemon=True).start()
+    return self
+
+
+# ----- Client-side autocomplete shards -----
+SHARD_PREFIX_LENGTH = 2
+
+
+def shard_name(prefix):
+  """File-system safe name of the shard for a folded prefix (hex of its UTF-8)."""
+  return prefix.encode('utf-8').hex()
+
+
+def shard_partitions(countries):
+  """Normalized country filter recorded in the shard manifest and compared by the server."""
+  return sorted({fold(c) for c in countries if fold(c)})
+
+
+def write_prefix_shards(store, out_dir, countries=()):
+  """Write gzip-compressed autocomplete shards, one per 2-character name prefix.
+
+  Each shard is a JSON list of `[folded name, "City, Country"]` pairs in
+  population order, so the browser can answer any prefix query of two or
+  more characters locally. Shards go into a directory named after a hash of
+  their content, which makes them safe to cache forever; `manifest.json`
+  points at the current directory and lists the shards that exist. Older
+  shard directories are removed. With `countries` (the CITY_PARTITIONS of the
+  deployment) only their cities are written, and the manifest records them.
+  """
+  if countries:
+    store = store.select_countries(countries)
+  shards = {}
+  names = store.all_names()
+  for city_id in range(len(store)):
+    label = store.label(city_id)
+    for name in names[city_id]:
+      if len(name) >= SHARD_PREFIX_LENGTH:
+        shards.setdefault(name[:SHARD_PREFIX_LENGTH], []).append([name, label])
+  bodies = {shard_name(prefix): json.dumps(entries, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            for prefix, entries in shards.items()}
+  digest = hashlib.sha1()
+  for name in sorted(bodies):
+    digest.update(name.encode('ascii'))
+    digest.update(bodies[name])
+  version = digest.hexdigest()[:12]
+  version_dir = os.path.join(out_dir, version)
+  os.makedirs(version_dir, exist_ok=True)
+  for name, body in bodies.items():
+    with open(os.path.join(version_dir, name + '.json.gz'), 'wb') as f:
+      # mtime=0 keeps the output byte-identical across rebuilds
+      f.write(gzip.compress(body, compresslevel=9, mtime=0))
+  manifest = {'version': version, 'prefix_length': SHARD_PREFIX_LENGTH, 'shards': sorted(bodies),
+              'partitions': shard_partitions(countries)}
+  tmp_path = os.path.join(out_dir, 'manifest.json.tmp')
+  with open(tmp_path, 'w', encoding='utf-8') as f:
+    json.dump(manifest, f, separators=(',', ':'))
+  os.replace(tmp_path, os.path.join(out_dir, 'manifest.json'))
+  for entry in os.listdir(out_dir):
+    path = os.path.join(out_dir, entry)
+    if entry != version and os.path.isdir(path):
+      shutil.rmtree(path, ignore_errors=True)
+  return manifest
+
+
+if __name__ == '__main__':
+  # Build step: python city_index.py [worldcities.csv] [worldcities.idx] [shard dir]
+  # Shards only cover the countries in CITY_PARTITIONS when it is set; the index keeps them all
+  here = os.path.dirname(os.path.abspath(__file__))
+  csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, 'worldcities.csv')
+  index_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(csv_path)[0] + '.idx'
+  shard_dir = sys.argv[3] if len(sys.argv) > 3 else os.path.join(here, 'static', 'city_shards')
+  store = CityStore.from_csv(csv_path)
+  write_index(store, index_path)
+  print(f"Wrote {len(store)} cities to {index_path}")
+  countries = [c.strip() for c in os.environ.get('CITY_PARTITIONS', '').split(',') if c.strip()]
+  manifest = write_prefix_shards(store, shard_dir, countries)
+  print(f"Wrote {len(manifest['shards'])} autocomplete shards to {os.path.join(shard_dir, manifest['version'])}")
@@ -0,0 +1,174 @@
+import contextlib
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+  import fcntl
+except ImportError:  # not on Windows; appends are then only serialized within a process
+  fcntl = None
+
+
+SECONDS_PER_DAY = 86400
+
+# One little-endian float64 file per column; rows are only ever appended
+RAW_COLUMNS = ('ts', 'temp_c', 'humidity', 'wind_kph', 'hci')
+DAILY_COLUMNS = ('day', 'temp_c', 'temp_min', 'temp_max', 'humidity', 'wind_kph', 'hci', 'count')
+_DTYPE = np.dtype('<f8')
+
+
+def location_key(location):
+  """Directory name for a canonical location label."""
+  return hashlib.sha1((location or '').strip().lower().encode('utf-8')).hexdigest()[:16]
+
+
+def _read_column(path, start=0):
+  """Rows [start:] of a column file (empty when missing)."""
+  try:
+    with open(path, 'rb') as f:
+      f.seek(start * _DTYPE.itemsize)
+      return np.fromfile(f, dtype=_DTYPE)
+  except FileNotFoundError:
+    return np.empty(0, dtype=_DTYPE)
+
+
+def _row_count(path):
+  try:
+    return os.path.getsize(path) // _DTYPE.itemsize
+  except FileNotFoundError:
+    return 0
+
+
+def _tail_start(path, first_value):
+  """Index of the first row >= first_value in a sorted column, reading only the pages it needs."""
+  rows = _row_count(path)
+  if not rows:
+    return 0
+  column = np.memmap(path, dtype=_DTYPE, mode='r', shape=(rows,))
+  return int(np.searchsorted(column, first_value))
+
+
+def downsample_daily(columns):
+  """Aggregate raw observation columns into one row per UTC day (means, temperature range, counts)."""
+  days = np.floor(columns['ts'] / SECONDS_PER_DAY)
+  unique_days, bucket = np.unique(days, return_inverse=True)
+  counts = np.bincount(bucket, minlength=len(unique_days)).astype(_DTYPE)
+  daily = {'day': unique_days, 'count': counts}
+  for name in ('temp_c', 'humidity', 'wind_kph', 'hci'):
+    values = columns[name]
+    present = ~np.isnan(values)
+    total = np.bincount(bucket, weights=np.where(present, values, 0.0), minlength=len(unique_days))
+    seen = np.bincount(bucket, weights=present, minlength=len(unique_days))
+    with np.errstate(invalid='ignore', divide='ignore'):
+      daily[name] = np.where(seen > 0, total / seen, np.nan)
+  temp_min = np.full(len(unique_days), np.inf)
+  temp_max = np.full(len(unique_days), -np.inf)
+  np.minimum.at(temp_min, bucket, np.where(np.isnan(columns['temp_c']), np.inf, columns['temp_c']))
+  np.maximum.at(temp_max, bucket, np.where(np.isnan(columns['temp_c']), -np.inf, columns['temp_c']))
+  daily['temp_min'] = np.where(np.isinf(temp_min), np.nan, temp_min)
+  daily['temp_max'] = np.where(np.isinf(temp_max), np.nan, temp_max)
+  return daily
+
+
+class ObservationStore:
+  """Append-only columnar time series of scored weather observations per location.
+
+  Every location has a raw tier (one row per observation) and a daily tier
+  that days are rolled into once they are over, so history reads touch at
+  most one row per past day plus today's raw rows. Column files of a tier can
+  differ in length after a crash mid-append; readers use the shortest, and
+  the next append first truncates the others to it. Appends to a location
+  are serialized across processes with a file lock.
+  """
+
+  def __init__(self, root):
+    self.root = root
+    self._lock = threading.Lock()
+
+  def _path(self, key, tier, column):
+    return os.path.join(self.root, key, f'{tier}.{column}.f8')
+
+  def _rows(self, key, tier, columns):
+    return min(_row_count(self._path(key, tier, column)) for column in columns)
+
+  def _read(self, key, tier, columns, start):
+    rows = self._rows(key, tier, columns)
+    return {
+      column: _read_column(self._path(key, tier, column), start)[:max(rows - start, 0)]
+      for column in columns
+    }
+
+  def _append(self, key, tier, columns, values):
+    # Drop the partial row a crash mid-append may have left, or the columns stay misaligned
+    rows = self._rows(key, tier, columns)
+    for column in columns:
+      path = self._path(key, tier, column)
+      if _row_count(path) > rows:
+        os.truncate(path, rows * _DTYPE.itemsize)
+    for column in columns:
+      with open(self._path(key, tier, column), 'ab') as f:
+        np.asarray(values[column], dtype=_DTYPE).tofile(f)
+
+  @contextlib.contextmanager
+  def _locked(self, key):
+    """Hold this process's lock and an exclusive flock on the location's lock file."""
+    with self._lock:
+      if fcntl is None:
+        yield
+        return
+      os.makedirs(os.path.join(self.root, key), exist_ok=True)
+      with open(os.path.join(self.root, key, 'lock'), 'ab') as f:
+        # Released when the file is closed
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+  def _newest_ts(self, key):
+    rows = self._rows(key, 'raw', RAW_COLUMNS)
+    ts = _read_column(self._path(key, 'raw', 'ts'), rows - 1) if rows else []
+    return float(ts[0]) if len(ts) else float('-inf')
+
+  def _roll_up(self, key, before_day):
+    """Append daily rows for every raw day before `before_day` not yet in the daily tier."""
+    daily_rows = self._rows(key, 'daily', DAILY_COLUMNS)
+    last_day = _read_column(self._path(key, 'daily', 'day'), daily_rows - 1)[:1] if daily_rows else []
+    first_day = float(last_day[0]) + 1 if len(last_day) else float('-inf')
+    start = _tail_start(self._path(key, 'raw', 'ts'), first_day * SECONDS_PER_DAY)
+    raw = self._read(key, 'raw', RAW_COLUMNS, start)
+    done = raw['ts'] < before_day * SECONDS_PER_DAY
+    if done.any():
+      self._append(key, 'daily', DAILY_COLUMNS, downsample_daily({c: v[done] for c, v in raw.items()}))
+
+  def record(self, location, ts, temp_c=None, humidity=None, wind_kph=None, hci=None):
+    """Append one observation; observations not newer than the last one recorded are ignored."""
+    key = location_key(location)
+    values = {'ts': ts, 'temp_c': temp_c, 'humidity': humidity, 'wind_kph': wind_kph, 'hci': hci}
+    row = {column: [np.nan if values[column] is None else float(values[column])] for column in RAW_COLUMNS}
+    with self._locked(key):
+      # Read under the lock: another process may have appended since our last record
+      last_ts = self._newest_ts(key)
+      if ts <= last_ts:
+        return False
+      os.makedirs(os.path.join(self.root, key), exist_ok=True)
+      day = ts // SECONDS_PER_DAY
+      if last_ts != float('-inf') and last_ts // SECONDS_PER_DAY < day:
+        self._roll_up(key, day)
+      self._append(key, 'raw', RAW_COLUMNS, row)
+      return True
+
+  def daily(self, location, days=30, now=None):
+    """Daily rows ({column: array}, oldest first) for the last `days` UTC days including today."""
+    key = location_key(location)
+    today = (time.time() if now is None else now) // SECONDS_PER_DAY
+    first_day = today - days + 1
+    with self._lock:
+      start = _tail_start(self._path(key, 'daily', 'day'), first_day)
+      history = self._read(key, 'daily', DAILY_COLUMNS, start)
+      last_rolled = history['day'][-1] if len(history['day']) else first_day - 1
+      start = _tail_start(self._path(key, 'raw', 'ts'), (last_rolled + 1) * SECONDS_PER_DAY)
+      recent = self._read(key, 'raw', RAW_COLUMNS, start)
+    recent = downsample_daily(recent)
+    keep = (recent['day'] >= first_day) & (recent['day'] <= today)
+    return {column: np.concatenate([history[column], recent[column][keep]]) for column in DAILY_COLUMNS}
@@ -0,0 +1,191 @@
+// Trim the full plotly.js bundle down to the traces the charts use.
+//
+//   node scripts/build-plotly-basic.js <plotly.min.js> [out] [trace...]
+//
+// The input is the full minified bundle (plotly.js-dist-min, or the copy in
+// the plotly Python package, plotly/package_data/plotly.min.js). The trace
+// modules other than the requested ones (default: bar and pie; scatter is
+// part of the core) are removed from the bundle's `Plotly.register([...])`
+// call, and then every top-level definition of the bundle that is no longer
+// referenced is dropped. This is the set of traces plotly.js's own "basic"
+// bundle has. The output is written with precompressed .gz and .br copies,
+// which the app serves as they are.
+//
+// Needs acorn (`npm install`), or run with `node --expose-internals` to use
+// the copy bundled with Node.
+
+const fs = require('fs');
+const zlib = require('zlib');
+
+function loadAcorn() {
+  try {
+    return require('acorn');
+  } catch (e) {
+    return require('internal/deps/acorn/acorn/dist/acorn');
+  }
+}
+const acorn = loadAcorn();
+
+// Statements of the function esbuild wraps the bundle in: `var Plotly=(()=>{...})()`
+function bundleBody(src) {
+  const ast = acorn.parse(src, { ecmaVersion: 'latest', sourceType: 'script' });
+  let found = null;
+  (function walk(node) {
+    if (found || !node || typeof node.type !== 'string') return;
+    if (node.type === 'VariableDeclarator' && node.id.name === 'Plotly') { found = node; return; }
+    for (const key in node) {
+      const value = node[key];
+      if (Array.isArray(value)) value.forEach(walk);
+      else if (value && typeof value.type === 'string') walk(value);
+    }
+  })(ast);
+  if (!found) throw new Error('no `var Plotly = (() => {...})()` in the bundle');
+  return found.init.callee.body.body;
+}
+
+// Names an AST node may refer to; property names and object keys are not references
+function references(node) {
+  const names = new Set();
+  (function walk(n, parent, key) {
+    if (!n || typeof n.type !== 'string') return;
+    if (n.type === 'Identifier') {
+      const isProperty = parent && !parent.computed && (
+        (parent.type === 'MemberExpression' && key === 'property') ||
+        (['Property', 'MethodDefinition', 'PropertyDefinition'].includes(parent.type) && key === 'key' && !parent.shorthand));
+      if (!isProperty) names.add(n.name);
+      return;
+    }
+    for (const k in n) {
+      const value = n[k];
+      if (Array.isArray(value)) value.forEach(child => walk(child, n, k));
+      else if (value && typeof value.type === 'string') walk(value, n, k);
+    }
+  })(node, null, null);
+  return names;
+}
+
+// Top-level definitions by name, and the statements that always run
+function definitions(body) {
+  const byName = new Map();
+  const roots = [];
+  const define = (name, node, stmt) => {
+    if (!byName.has(name)) byName.set(name, []);
+    byName.get(name).push({ node, stmt });
+  };
+  for (const stmt of body) {
+    if (stmt.type === 'FunctionDeclaration') {
+      define(stmt.id.name, stmt, stmt);
+    } else if (stmt.type === 'VariableDeclaration') {
+      for (const decl of stmt.declarations) {
+        if (decl.id.type === 'Identifier') define(decl.id.name, decl, stmt);
+        else roots.push(decl);
+      }
+    } else if (isExportDefinition(stmt)) {
+      // esbuild's `Fp(namespace, {...getters})` only matters if the namespace does
+      define(stmt.expression.arguments[0].name, stmt, stmt);
+    } else {
+      roots.push(stmt);
+    }
+  }
+  return { byName, roots };
+}
+
+function isExportDefinition(stmt) {
+  const call = stmt.type === 'ExpressionStatement' && stmt.expression;
+  return call && call.type === 'CallExpression' && call.callee.type === 'Identifier' &&
+    call.arguments.length === 2 && call.arguments[0].type === 'Identifier' &&
+    call.arguments[1].type === 'ObjectExpression' && call.arguments[1].properties.every(p => p.value && p.value.type === 'ArrowFunctionExpression');
+}
+
+// The `X.register([a(), b(), ...])` call listing every trace module
+function traceRegistry(src, body) {
+  let best = null;
+  for (const stmt of body) {
+    const text = src.slice(stmt.start, stmt.end);
+    const match = /\.register\(\[((?:\w+\(\),)*\w+\(\))\]\)/.exec(text);
+    if (match && (!best || match[1].length > best.list.length)) {
+      best = { start: stmt.start + match.index, end: stmt.start + match.index + match[0].length, list: match[1] };
+    }
+  }
+  if (!best) throw new Error('no trace registry in the bundle');
+  return best;
+}
+
+// Trace name of a registered module, following `module.exports = other()` re-exports
+function traceName(src, byName, name) {
+  for (let depth = 0; depth < 4 && byName.has(name); depth++) {
+    const text = src.slice(byName.get(name)[0].node.start, byName.get(name)[0].node.end);
+    const trace = /moduleType:"trace",name:"(\w+)"/.exec(text);
+    if (trace) return trace[1];
+    const reexport = /exports=(\w+)\(\)\}\)$/.exec(text);
+    if (!reexport) return null;
+    name = reexport[1];
+  }
+  return null;
+}
+
+function trim(src, traces) {
+  let body = bundleBody(src);
+  const registry = traceRegistry(src, body);
+  const { byName } = definitions(body);
+  const modules = registry.list.split(',').map(call => call.slice(0, -2));
+  const keep = modules.filter(name => traces.includes(traceName(src, byName, name)));
+  const missing = traces.filter(trace => !keep.some(name => traceName(src, byName, name) === trace));
+  if (missing.length) throw new Error(`traces not in the bundle: ${missing.join(', ')}`);
+  src = src.slice(0, registry.start) + `.register([${keep.map(name => name + '()').join(',')}])` + src.slice(registry.end);
+
+  body = bundleBody(src);
+  const defs = definitions(body);
+  const live = new Set();
+  const queue = [];
+  const visit = node => {
+    for (const name of references(node)) {
+      if (defs.byName.has(name) && !live.has(name)) { live.add(name); queue.push(name); }
+    }
+  };
+  defs.roots.forEach(visit);
+  while (queue.length) defs.byName.get(queue.shift()).forEach(def => visit(def.node));
+
+  const edits = [];
+  for (const stmt of body) {
+    if (stmt.type === 'VariableDeclaration') {
+      const kept = stmt.declarations.filter(d => d.id.type !== 'Identifier' || live.has(d.id.name));
+      if (kept.length < stmt.declarations.length) {
+        edits.push([stmt.start, stmt.end, kept.length ? `${stmt.kind} ${kept.map(d => src.slice(d.start, d.end)).join(',')};` : '']);
+      }
+    } else if ((stmt.type === 'FunctionDeclaration' && !live.has(stmt.id.name)) ||
+               (isExportDefinition(stmt) && !live.has(stmt.expression.arguments[0].name))) {
+      edits.push([stmt.start, stmt.end, '']);
+    }
+  }
+  let out = '';
+  let pos = 0;
+  for (const [start, end, replacement] of edits) {
+    out += src.slice(pos, start) + replacement;
+    pos = end;
+  }
+  return { code: out + src.slice(pos), kept: live.size, total: defs.byName.size };
+}
+
+function main() {
+  const [input, output = 'static/js/plotly-basic.min.js', ...args] = process.argv.slice(2);
+  if (!input) {
+    console.error('usage: node scripts/build-plotly-basic.js <plotly.min.js> [out] [trace...]');
+    process.exit(2);
+  }
+  const traces = args.length ? args : ['bar', 'pie'];
+  const src = fs.readFileSync(input, 'utf8');
+  const banner = /^\/\*\*\n\* plotly\.js (v[\w.-]+)\n/.exec(src);
+  if (!banner) throw new Error('unexpected bundle banner; is this plotly.min.js?');
+  const { code, kept, total } = trim(src, traces);
+  const names = ['scatter', ...traces];
+  const list = names.slice(0, -1).join(', ') + ' and ' + names[names.length - 1];
+  const header = `/**\n* plotly.js ${banner[1]}, trimmed to the ${list} traces by scripts/build-plotly-basic.js\n`;
+  const body = Buffer.from(code.replace(banner[0], header));
+  fs.writeFileSync(output, body);
+  fs.writeFileSync(output + '.gz', zlib.gzipSync(body, { level: 9 }));
+  fs.writeFileSync(output + '.br', zlib.brotliCompressSync(body, { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 11 } }));
+  console.log(`Kept ${kept} of ${total} definitions: ${src.length} -> ${body.length} bytes in ${output}`);
+}
+
+main();
@@ -0,0 +1,73 @@
+// Weather KPIs and all charts come from one request (one upstream fetch)
+async function fetchDashboard(location){
+  const resp = await fetch('/api/dashboard', {method:'POST', headers:{'Content-Type':'application/json'}, body:JSON.stringify({location:location, compact:true, width:document.getElementById('chart-monthly').clientWidth})});
+  return await resp.json();
+}
+
+// Compact charts name a shared layout (theme + template); fetch each id once and reuse it
+const chartLayouts = {};
+function fetchChartLayout(id){
+  if(!chartLayouts[id]){
+    chartLayouts[id] = fetch('/api/chart_layout/' + encodeURIComponent(id)).then(r => {
+      if(!r.ok){ delete chartLayouts[id]; throw new Error('Unknown chart layout ' + id); }
+      return r.json();
+    });
+  }
+  return chartLayouts[id];
+}
+
+function mergeLayout(base, own){
+  const out = Object.assign({}, base);
+  for(const key in own){
+    const value = own[key];
+    const isObj = value && typeof value === 'object' && !Array.isArray(value);
+    out[key] = (isObj && base[key] && typeof base[key] === 'object') ? mergeLayout(base[key], value) : value;
+  }
+  return out;
+}
+
+async function plotChart(el, chart){
+  const layout = chart.layout_id ? mergeLayout(await fetchChartLayout(chart.layout_id), chart.layout) : chart.layout;
+  Plotly.newPlot(el, chart.data, layout, {responsive: true});
+}
+
+function renderKPIs(data){
+  document.getElementById('viz-hci').textContent = data.hci || '--';
+  document.getElementById('viz-temp').textContent = data.temperature_c ? data.temperature_c + ' °C' : '--';
+  const vizHumVal = (data.humidity !== undefined && data.humidity !== null && data.humidity !== '') ? data.humidity : null;
+  document.getElementById('viz-hum').textContent = vizHumVal !== null ? String(vizHumVal) + ' %' : '--';
+  if(data.aqi){
+    const pm25 = data.aqi.pm2_5 || data.aqi['pm2_5'] || null;
+    document.getElementById('viz-aqi').textContent = pm25 ? pm25.toFixed(1) : 'N/A';
+  } else { document.getElementById('viz-aqi').textContent = '--'; }
+}
+
+async function refreshViz(){
+  const loc = document.getElementById('viz-location').value || 'London';
+
+  try {
+    const dashboard = await fetchDashboard(loc);
+    if(dashboard.error) {
+      console.error('Dashboard error:', dashboard.error);
+    } else {
+      renderKPIs(dashboard.weather);
+      const charts = dashboard.charts;
+      // Render each chart using Plotly.newPlot
+      await Promise.all([
+        plotChart('chart-hci', charts.hci),
+        plotChart('chart-temp', charts.temperature),
+        plotChart('chart-humidity', charts.humidity),
+        plotChart('chart-wind', charts.wind),
+        plotChart('chart-monthly', charts.monthly)
+      ]);
+    }
+  } catch (err) {
+    console.error('Error refreshing visualization:', err);
+  }
+}
+
+document.addEventListener('DOMContentLoaded', ()=>{
+  document.getElementById('viz-fetch').addEventListener('click', refreshViz);
+  document.getElementById('viz-location').value = 'London';
+  refreshViz();
+});
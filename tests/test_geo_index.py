@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from city_index import EARTH_RADIUS_KM, GeoIndex
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+  lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+  a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+  return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def brute_force(lat, lng, q_lat, q_lng, k):
+  distances = haversine_km(q_lat, q_lng, lat, lng)
+  order = np.argsort(distances, kind='stable')[:k]
+  return [(float(distances[i]), int(i)) for i in order]
+
+
+def cities(seed):
+  """Random cities worldwide plus clusters straddling the antimeridian and near the poles."""
+  rng = np.random.default_rng(seed)
+  lat = np.concatenate([np.degrees(np.arcsin(rng.uniform(-1, 1, 3000))), rng.uniform(-20, 20, 300), rng.uniform(85, 90, 100)])
+  lng = np.concatenate([rng.uniform(-180, 180, 3000), rng.choice([-1, 1], 300) * rng.uniform(178, 180, 300), rng.uniform(-180, 180, 100)])
+  return lat, lng
+
+
+@pytest.mark.parametrize('k', [1, 5, 40])
+def test_nearest_matches_brute_force(k):
+  lat, lng = cities(seed=k)
+  index = GeoIndex(lat, lng)
+  rng = np.random.default_rng(100 + k)
+  queries = [(q_lat, q_lng) for q_lat, q_lng in zip(rng.uniform(-90, 90, 100), rng.uniform(-180, 180, 100))]
+  # Queries on either side of the antimeridian and at the pole
+  queries += [(0.0, 179.99), (0.0, -179.99), (10.0, 180.0), (-10.0, -180.0), (90.0, 0.0), (89.5, 179.0)]
+  for q_lat, q_lng in queries:
+    got = index.nearest(q_lat, q_lng, k)
+    expected = brute_force(lat, lng, q_lat, q_lng, k)
+    assert [city_id for _, city_id in got] == [city_id for _, city_id in expected]
+    assert np.allclose([d for d, _ in got], [d for d, _ in expected], atol=1e-6)
+
+
+def test_nearest_crosses_the_antimeridian():
+  index = GeoIndex([0.0, 0.0, 0.0], [179.9, -179.9, 170.0])
+  assert [city_id for _, city_id in index.nearest(0.0, -179.95, 2)] == [1, 0]
+
+
+def test_empty_index():
+  assert GeoIndex(np.zeros(0), np.zeros(0)).nearest(0.0, 0.0) == []
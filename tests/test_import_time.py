@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold import of the app, in seconds: about 0.3 s without plotly, which alone adds 0.5 s.
+# Slower CI machines can raise it with IMPORT_BUDGET_SECONDS.
+IMPORT_BUDGET = float(os.environ.get('IMPORT_BUDGET_SECONDS', '0.6'))
+
+CHECK = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - start, 'modules': sorted(sys.modules)}}))
+'''
+
+
+def cold_import(module):
+  """Import `module` in a fresh interpreter; returns (seconds, loaded module names)."""
+  env = dict(os.environ, PRELOAD_CHARTS='0', CITY_RELOAD_INTERVAL='0')
+  out = subprocess.run([sys.executable, '-c', CHECK.format(module=module)], cwd=ROOT, env=env,
+                       capture_output=True, text=True, check=True, timeout=60).stdout
+  result = json.loads(out.strip().splitlines()[-1])
+  return result['seconds'], set(result['modules'])
+
+
+@pytest.mark.parametrize('module', ['app', 'main'])
+def test_app_import_is_lazy_and_fast(module):
+  # Best of three, so one slow run on a busy machine doesn't fail the test
+  runs = [cold_import(module) for _ in range(3)]
+  seconds = min(seconds for seconds, _ in runs)
+  assert 'plotly' not in runs[0][1]
+  assert seconds < IMPORT_BUDGET, f"importing {module} took {seconds:.2f}s (budget {IMPORT_BUDGET}s)"
@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import pytest
+
+from app import downsample_series, lttb_indices
+
+
+def reference_lttb(x, y, threshold):
+  """Point-by-point Largest-Triangle-Three-Buckets (Steinarsson, 2013)."""
+  n = len(y)
+  every = (n - 2) / (threshold - 2)
+  keep = [0]
+  a = 0
+  for i in range(threshold - 2):
+    next_start = int(math.floor((i + 1) * every)) + 1
+    next_end = min(int(math.floor((i + 2) * every)) + 1, n)
+    if i == threshold - 3:
+      avg_x, avg_y = x[n - 1], y[n - 1]
+    else:
+      avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+      avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+    start = int(math.floor(i * every)) + 1
+    end = int(math.floor((i + 1) * every)) + 1
+    best, best_area = start, -1.0
+    for j in range(start, end):
+      area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+      if area > best_area:
+        best, best_area = j, area
+    keep.append(best)
+    a = best
+  keep.append(n - 1)
+  return keep
+
+
+def random_walk(n, seed):
+  rng = np.random.default_rng(seed)
+  x = np.cumsum(rng.uniform(0.5, 1.5, n))
+  return x, np.cumsum(rng.normal(size=n))
+
+
+@pytest.mark.parametrize('n, max_points', [(10, 3), (100, 7), (1000, 100), (5000, 2000), (2001, 2000)])
+def test_lttb_matches_reference(n, max_points):
+  x, y = random_walk(n, seed=n)
+  keep = lttb_indices(x, y, max_points)
+  assert len(keep) == max_points
+  assert keep[0] == 0 and keep[-1] == n - 1
+  assert np.all(np.diff(keep) > 0)
+  assert keep.tolist() == reference_lttb(x.tolist(), y.tolist(), max_points)
+
+
+def test_lttb_keeps_short_series():
+  x, y = random_walk(50, seed=1)
+  assert lttb_indices(x, y, 50).tolist() == list(range(50))
+  assert lttb_indices(x, y, 2).tolist() == list(range(50))
+
+
+def test_downsample_series_spaces_categories_by_position():
+  labels = [f'2026-10-{d:02d} {h:02d}:00' for d in range(1, 11) for h in range(24)]
+  values = [math.sin(i / 7) for i in range(len(labels))]
+  x, y = downsample_series(labels, values, 40)
+  assert len(x) == len(y) == 40
+  assert x[0] == labels[0] and x[-1] == labels[-1]
+  assert all(values[labels.index(label)] == value for label, value in zip(x, y))
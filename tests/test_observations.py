@@ -0,0 +1,28 @@
+import os
+
+import numpy as np
+
+from observations import ObservationStore, location_key
+
+
+def read(root, location, column):
+  return np.fromfile(os.path.join(root, location_key(location), f'raw.{column}.f8')).tolist()
+
+
+def test_append_realigns_columns_after_partial_write(tmp_path):
+  store = ObservationStore(str(tmp_path))
+  assert store.record('Paris', 100, temp_c=1.0)
+  # A crash after writing only the ts column of the next row
+  with open(os.path.join(str(tmp_path), location_key('Paris'), 'raw.ts.f8'), 'ab') as f:
+    np.array([200.0]).tofile(f)
+  assert store.record('Paris', 300, temp_c=3.0)
+  assert read(str(tmp_path), 'Paris', 'ts') == [100.0, 300.0]
+  assert read(str(tmp_path), 'Paris', 'temp_c') == [1.0, 3.0]
+
+
+def test_older_observations_are_ignored(tmp_path):
+  store = ObservationStore(str(tmp_path))
+  assert store.record('Paris', 100, temp_c=1.0)
+  assert not store.record('Paris', 100, temp_c=2.0)
+  assert not store.record('Paris', 50, temp_c=2.0)
+  assert read(str(tmp_path), 'Paris', 'temp_c') == [1.0]
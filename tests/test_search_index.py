@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from city_index import CityStore, FuzzyIndex, TrigramIndex, edit_distance, fold
+
+SYLLABLES = ['ka', 'lo', 'ma', 'ri', 'san', 'to', 'ber', 'gu', 'na', 'pe', 'ya', 'zo', 'chi', 'dé', 'ø', 'ül']
+
+
+def make_store(seed, count=600):
+  rng = random.Random(seed)
+  rows = [{'city': 'São Paulo', 'city_ascii': 'Sao Paulo', 'country': 'Brazil', 'population': '1'},
+          {'city': 'Zürich', 'city_ascii': 'Zurich', 'country': 'Switzerland', 'population': '1'},
+          {'city': 'Kraków', 'city_ascii': 'Krakow', 'country': 'Poland', 'population': '1'}]
+  for i in range(count):
+    name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 5))).capitalize()
+    if rng.random() < 0.2:
+      name += ' ' + rng.choice(SYLLABLES)
+    rows.append({'city': name, 'city_ascii': name, 'country': 'Testland', 'population': str(rng.randint(1, 10 ** 6))})
+  return CityStore.from_rows(rows)
+
+
+def typo(word, rng, edits):
+  for _ in range(edits):
+    i = rng.randrange(len(word) + 1)
+    kind = rng.choice('sidt')
+    if kind == 's' and i < len(word):
+      word = word[:i] + rng.choice('abkmoz') + word[i + 1:]
+    elif kind == 'i':
+      word = word[:i] + rng.choice('abkmoz') + word[i:]
+    elif kind == 'd' and len(word) > 1 and i < len(word):
+      word = word[:i] + word[i + 1:]
+    elif kind == 't' and i + 1 < len(word):
+      word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+  return word
+
+
+def linear_substring(names, ids, query):
+  return [i for i in ids if any(query in name for name in names[i])]
+
+
+def linear_fuzzy(names, ids, query, max_distance):
+  matches = []
+  for i in ids:
+    for name in names[i]:
+      if name:
+        dist = edit_distance(query, name, max_distance)
+        if dist <= max_distance:
+          matches.append((dist, i))
+  return sorted(matches)
+
+
+@pytest.mark.parametrize('partitioned', [False, True])
+def test_substring_search_matches_linear_scan(partitioned):
+  store = make_store(seed=1)
+  names = store.all_names()
+  ids = list(range(0, len(store), 3)) if partitioned else list(range(len(store)))
+  index = TrigramIndex(names, ids if partitioned else None)
+  rng = random.Random(2)
+  queries = ['sao', 'zur', 'ürich', 'ow', 'o p', 'xq', 'kakaka', 'lo']
+  for _ in range(200):
+    name = rng.choice(names[rng.randrange(len(store))])
+    start = rng.randrange(len(name))
+    queries.append(name[start:start + rng.randint(2, 6)])
+  for query in queries:
+    query = fold(query)
+    if len(query) >= 2:
+      assert list(index.search(query)) == linear_substring(names, ids, query), query
+
+
+@pytest.mark.parametrize('partitioned', [False, True])
+def test_fuzzy_search_matches_linear_scan(partitioned):
+  store = make_store(seed=3)
+  names = store.all_names()
+  ids = list(range(1, len(store), 2)) if partitioned else list(range(len(store)))
+  index = FuzzyIndex(names, ids if partitioned else None)
+  rng = random.Random(4)
+  queries = ['zurihc', 'krakw', 'sao pualo', 'qqqqqq']
+  for _ in range(150):
+    name = rng.choice(names[rng.randrange(len(store))])
+    queries.append(typo(name, rng, rng.randint(0, 3)))
+  for query in queries:
+    for max_distance in (1, 2):
+      assert index.search(query, max_distance) == linear_fuzzy(names, ids, query, max_distance), (query, max_distance)
+
+
+def test_edit_distance_counts_transpositions_once():
+  assert edit_distance('paris', 'pairs', 2) == 1
+  assert edit_distance('london', 'lnodno', 3) == 2
+  assert edit_distance('abc', 'xyzw', 2) == 3